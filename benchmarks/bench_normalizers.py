@@ -0,0 +1,51 @@
+"""
+Microbenchmark of the VideoRecord normalizers.
+
+Run from the repository root:
+    python -m benchmarks.bench_normalizers [record_count]
+"""
+import random
+import sys
+import timeit
+
+from youtube_find.records import normalize_many, parse_count, parse_duration
+
+
+def make_snapshots(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    counts = ['1,234', '12K', '1.2M', '1,2 M', '3B', '987', '1.234.567', '45 678']
+    snapshots = []
+    for index in range(count):
+        snapshots.append({
+            'Title': f'Video {index}',
+            'Video URL': f'https://www.youtube.com/watch?v={index:011d}',
+            'Video Length': f'PT{rng.randint(0, 3)}H{rng.randint(0, 59)}M{rng.randint(0, 59)}S',
+            'View Count': rng.randint(0, 10 ** 9),
+            'Like Count': f'like this video along with {rng.choice(counts)} other people',
+            'Comment Count': rng.randint(0, 10 ** 5),
+            'Sub Count': rng.choice(counts),
+            'Upload Date': '2024-03-05T08:00:07-08:00',
+            'Date Published': '2024-03-05T08:00:07-08:00',
+            'Family Friendly': 'true',
+            'KeyWords': ['music', 'live'],
+            'Allowed Regions': 'US,GB,FR',
+        })
+    return snapshots
+
+
+def main(count: int = 100_000) -> None:
+    snapshots = make_snapshots(count)
+
+    seconds = min(timeit.repeat(lambda: normalize_many(snapshots), number=1, repeat=3))
+    print(f'normalize_many: {count} records in {seconds:.3f}s ({count / seconds:,.0f} records/s)')
+
+    loops = 200_000
+    seconds = min(timeit.repeat(lambda: parse_count('1,2 M'), number=loops, repeat=3))
+    print(f'parse_count:    {seconds / loops * 1e6:.2f} us/call')
+
+    seconds = min(timeit.repeat(lambda: parse_duration('PT1H2M3S'), number=loops, repeat=3))
+    print(f'parse_duration: {seconds / loops * 1e6:.2f} us/call')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
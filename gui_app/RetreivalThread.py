@@ -1,32 +1,64 @@
+import logging
+from typing import List
+
 from PyQt6.QtCore import pyqtSignal, QThread
 from PyQt6.QtGui import QPixmap
 from youtube_find.youtube_checker import YoutubeChecker
-import requests
+from youtube_find.thumbnails import ThumbnailPipeline, video_id_from_thumbnail
+import youtube_find.canonical as canonical
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
 
 
 class RetrievalWorker(QThread):
     retreival_complete = pyqtSignal(dict, QPixmap)
     
-    def __init__(self, yt_checker: YoutubeChecker, url: str ) -> None:
+    def __init__(self, yt_checker: YoutubeChecker, url: str, thumbnails: ThumbnailPipeline = None) -> None:
         super().__init__()
         
         self.yt_checker = yt_checker
         self.url = url
+        self.thumbnails = thumbnails or ThumbnailPipeline(max_workers=2)
     
     def retrieve(self):
         try:
             # Retrieve information and thumbnail
             infomations = self.yt_checker.retrieve_infos(self.url)
-            thumbnail_url = self.yt_checker.thumbnail()
-            
-            response = requests.get(thumbnail_url)
-            response.raise_for_status()
+            video_id = video_id_from_thumbnail(self.yt_checker.thumbnail())
             
             pixmap = QPixmap()
-            pixmap.loadFromData(response.content)
+            thumbnail = self.thumbnails.fetch(video_id, size=(250, 80)) if video_id else None
+            if thumbnail:
+                pixmap.loadFromData(thumbnail)
 
             # Emit the signal with retrieved data
             self.retrieval_complete.emit(infomations, pixmap)
 
         except Exception as e:
-            print(f"Error retrieving data: {e}")
\ No newline at end of file
+            print(f"Error retrieving data: {e}")
+
+class BatchRetrievalWorker(QThread):
+    result_ready = pyqtSignal(str, dict)
+    result_failed = pyqtSignal(str, str)
+
+    def __init__(self, yt_checker: YoutubeChecker, urls: List[str]) -> None:
+        super().__init__()
+
+        self.yt_checker = yt_checker
+        self.urls = urls
+
+    def run(self):
+        # One signal per video, the table model batches the inserts on its side
+        for video_id in canonical.dedupe(self.urls):
+            if self.isInterruptionRequested():
+                break
+            try:
+                infomations = self.yt_checker.retrieve_infos(video_id)
+            except Exception as e:
+                youtube_logger.exception(f'Error retrieving {video_id}: {e}')
+                self.result_failed.emit(video_id, str(e))
+                continue
+            if infomations:
+                self.result_ready.emit(video_id, infomations)
+            else:
+                self.result_failed.emit(video_id, 'No infomations retrieved')
@@ -1,7 +1,9 @@
 from PyQt6.QtGui import QPixmap
-import requests
 import logging
+import re
+from gui_app.RetreivalThread import BatchRetrievalWorker
 from youtube_find.youtube_checker import YoutubeChecker
+from youtube_find.thumbnails import ThumbnailPipeline, video_id_from_thumbnail
 
 youtube_logger = logging.getLogger('youtube_find.youtube_checker')
 
@@ -10,12 +12,16 @@ class AppButtonHandler:
     def __init__(self, parent, webdriver_path: str) -> None:
         self.app = parent
         self.yt_checker = YoutubeChecker(webdriver_path, auto_closing=True)
+        self.thumbnails = ThumbnailPipeline()
+        self.batch_worker = None
         
     def button_pressed(self, sender) -> None:
         if sender == self.app.retrive_button:
             self.retrive_button_clicked(sender)
         elif sender == self.app.search_box:
             self.retrive_button_clicked(sender)
+        elif sender == self.app.batch_button:
+            self.batch_button_clicked()
         elif sender == self.app.label_button_list:
             self.list_widget_button_clicked(sender.currentItem())
         elif sender == self.app.clear_button:
@@ -45,6 +51,23 @@ class AppButtonHandler:
         else:
             return
         
+        if sender not in (self.app.retrive_button, self.app.search_box, self.app.clear_button, self.app.label_button_list, self.app.batch_button):
+            self.refresh_action_states()
+        
+        
+    def refresh_action_states(self) -> None:
+        """Update the action buttons text from one snapshot of the watch page"""
+        try:
+            state = self.yt_checker.actions.state_snapshot(timeout=2)
+        except Exception as e:
+            youtube_logger.exception(f'Could not read the video state: {e}')
+            return
+        
+        self.app.like_button.setText('Undo Like' if state['liked'] else 'Like')
+        self.app.dislike_button.setText('Undo Dislike' if state['disliked'] else 'Dislike')
+        self.app.sub_button.setText('Unsub' if state['subscribed'] else 'Sub')
+        self.app.pause_button.setText('Pause Video' if state['playing'] else 'Play Video')
+        
         
     def list_widget_button_clicked(self, current_item) -> None:
         sender_text = current_item.text() if current_item else None
@@ -69,13 +92,11 @@ class AppButtonHandler:
         
         
     def retrive_button_clicked(self, sender) -> None:
-        url = self.app.search_box.text()
-        if url == self.app.current_url:
+        if self.batch_worker is not None:    # the batch owns the driver until it finishes
             return
-    
-        # Validate URL
-        if not self.app.is_valid_url(url):
-              # For debugging purposes
+        url = self.app.format_url(self.app.search_box.text())
+        # Invalid URL, or the same video written another way
+        if not url or url == self.app.current_url:
             return
 
         
@@ -88,12 +109,12 @@ class AppButtonHandler:
             self.app.infomations = self.yt_checker.retrieve_infos(self.app.current_url)
             
             
-            thumbnail = self.yt_checker.thumbnail()
-            response = requests.get(thumbnail)
-            response.raise_for_status()
-            
+            # Smallest variant covering the 250x80 label, over the pooled session
+            video_id = video_id_from_thumbnail(self.yt_checker.thumbnail())
             pixmap = QPixmap()
-            pixmap.loadFromData(response.content)
+            thumbnail = self.thumbnails.fetch(video_id, size=(250, 80)) if video_id else None
+            if thumbnail:
+                pixmap.loadFromData(thumbnail)
             
             self.app.thumbnail_url_label.setPixmap(pixmap)
             self.app.thumbnail_url_label.setScaledContents(True)
@@ -104,10 +125,45 @@ class AppButtonHandler:
             for button in self.app.action_buttons:
                 button.setEnabled(True)
             self.app.label_button_list.setEnabled(True)
+            self.refresh_action_states()
             
             self.app.text_area.setText('Infomations Retrieved!')
             sender.setEnabled(True)
             
         except Exception as e:
             youtube_logger.exception(f"Error retrieving data: {e}")
-            self.app.text_area.setText(f'Error retrieving data: {e}')
\ No newline at end of file
+            self.app.text_area.setText(f'Error retrieving data: {e}')
+    
+    
+    def batch_button_clicked(self) -> None:
+        urls = [url for url in re.split(r'[\s,]+', self.app.search_box.text()) if self.app.is_valid_url(url)]
+        if not urls or self.batch_worker is not None:
+            return
+        
+        self.app.text_area.hide()
+        self.app.results_model.clear()
+        self.app.results_filter.show()
+        self.app.results_table.show()
+        
+        # The worker drives the browser from its thread, nothing else may touch it meanwhile
+        self.app.batch_button.setDisabled(True)
+        for button in self.app.action_buttons:
+            if button != self.app.clear_button:
+                button.setDisabled(True)
+        
+        self.batch_worker = BatchRetrievalWorker(self.yt_checker, urls)
+        self.batch_worker.result_ready.connect(self.app.results_model.add_result)
+        self.batch_worker.result_failed.connect(self.app.results_model.add_failure)
+        self.batch_worker.finished.connect(self.batch_finished)
+        self.batch_worker.start()
+    
+    
+    def batch_finished(self) -> None:
+        self.app.results_model.flush()
+        self.batch_worker = None
+        
+        self.app.batch_button.setEnabled(True)
+        self.app.retrive_button.setEnabled(True)
+        # The browser is left on the last page of the batch, not on current_url: the page
+        # actions stay disabled until a single retrieval opens a video again, even the same one
+        self.app.current_url = None
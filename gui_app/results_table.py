@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QObject, QSortFilterProxyModel, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPixmap
+
+from youtube_find.records import VideoRecord
+from youtube_find.thumbnails import ThumbnailPipeline
+
+
+# (header, infos key, VideoRecord attribute used for sorting)
+COLUMNS: List[Tuple[str, str, str]] = [
+    ('Thumbnail', 'Thumbnail', 'video_id'),
+    ('Title', 'Title', 'title'),
+    ('Channel', 'ChannelName', 'channel_name'),
+    ('Length', 'Video Length', 'duration'),
+    ('Views', 'View Count', 'view_count'),
+    ('Likes', 'Like Count', 'like_count'),
+    ('Comments', 'Comment Count', 'comment_count'),
+    ('Subs', 'Sub Count', 'sub_count'),
+    ('Uploaded', 'Upload Date', 'upload_date'),
+    ('Genre', 'Video Genre', 'genre'),
+]
+
+THUMBNAIL_SIZE = (64, 36)
+
+
+class ThumbnailLoader(QObject):
+    """Download thumbnails off the GUI thread and hand the bytes back through a queued signal"""
+
+    loaded = pyqtSignal(str, bytes)
+
+    def __init__(self, pipeline: Optional[ThumbnailPipeline] = None) -> None:
+        super().__init__()
+        self.pipeline = pipeline or ThumbnailPipeline(max_workers=4)
+
+    def request(self, video_id: str) -> None:
+        future = self.pipeline.submit(video_id, THUMBNAIL_SIZE)
+        future.add_done_callback(lambda done: self._done(video_id, done))
+
+    def _done(self, video_id: str, future) -> None:
+        try:
+            data = future.result()
+        except Exception:
+            data = None
+        self.loaded.emit(video_id, data or b'')
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Batch results as a table, one row per video.
+
+    Rows arrive through add_result / add_failure and are inserted in chunks. Thumbnails are only
+    requested when the view asks for them, i.e. for rows that are actually painted,
+    and a bounded number of decoded pixmaps is kept.
+    """
+
+    def __init__(self, loader: Optional[ThumbnailLoader] = None, max_pixmaps: int = 500, parent=None) -> None:
+        super().__init__(parent)
+        self._rows: List[Tuple[Dict[str, Any], VideoRecord]] = []
+        self._row_of: Dict[str, int] = {}
+        self._pending: List[Tuple[Dict[str, Any], VideoRecord]] = []
+        self._errors: Dict[str, str] = {}
+
+        self.loader = loader or ThumbnailLoader()
+        self.loader.loaded.connect(self._thumbnail_loaded)
+        self.max_pixmaps = max_pixmaps
+        self._pixmaps: OrderedDict = OrderedDict()
+        self._requested = set()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(100)
+        self._flush_timer.timeout.connect(self.flush)
+
+
+    def add_result(self, video_id: str, infos: Dict[str, Any]) -> None:
+        """Queue one result, rows are inserted at most every 100 ms"""
+        record = VideoRecord.from_infos(infos)
+        record.video_id = record.video_id or video_id
+        self._queue(infos, record)
+
+
+    def add_failure(self, video_id: str, error: str) -> None:
+        """Queue a row for a video that could not be retrieved, shown with its error"""
+        self._errors[video_id] = error
+        self._queue({'Title': f'Retrieval failed: {error}'}, VideoRecord(video_id=video_id))
+
+
+    def _queue(self, infos: Dict[str, Any], record: VideoRecord) -> None:
+        self._pending.append((infos, record))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+
+    def flush(self) -> None:
+        pending = [(infos, record) for infos, record in self._pending if record.video_id not in self._row_of]
+        self._pending = []
+        if not pending:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        for offset, (infos, record) in enumerate(pending):
+            self._row_of[record.video_id] = first + offset
+            self._rows.append((infos, record))
+        self.endInsertRows()
+
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._rows.clear()
+        self._row_of.clear()
+        self._pending.clear()
+        self._errors.clear()
+        self._pixmaps.clear()
+        self._requested.clear()
+        self.endResetModel()
+
+
+    def infos_at(self, row: int) -> Dict[str, Any]:
+        return self._rows[row][0]
+
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        infos, record = self._rows[index.row()]
+        _, key, attribute = COLUMNS[index.column()]
+
+        if index.column() == 0:
+            if role == Qt.ItemDataRole.DecorationRole:
+                return self._thumbnail(record.video_id)
+            if role == Qt.ItemDataRole.UserRole:
+                return record.video_id
+            return None
+
+        if role == Qt.ItemDataRole.ForegroundRole and record.video_id in self._errors:
+            return QColor('#c0392b')
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = infos.get(key)
+            return '' if value is None else str(value)
+        if role == Qt.ItemDataRole.UserRole:
+            # Typed value for sorting: numbers sort as numbers, dates as dates
+            value = getattr(record, attribute)
+            if value is None:
+                return ''
+            return value.isoformat() if hasattr(value, 'isoformat') else value
+        return None
+
+
+    def _thumbnail(self, video_id: str) -> Optional[QPixmap]:
+        pixmap = self._pixmaps.get(video_id)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(video_id)
+            return pixmap
+
+        if video_id not in self._requested:
+            self._requested.add(video_id)
+            self.loader.request(video_id)
+        return None
+
+
+    def _thumbnail_loaded(self, video_id: str, data: bytes) -> None:
+        row = self._row_of.get(video_id)
+        if not data or row is None:
+            self._requested.discard(video_id)   # requested again the next time it is painted
+            return
+
+        pixmap = QPixmap()
+        pixmap.loadFromData(data)
+        self._pixmaps[video_id] = pixmap.scaled(
+            *THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+        while len(self._pixmaps) > self.max_pixmaps:
+            evicted, _ = self._pixmaps.popitem(last=False)
+            self._requested.discard(evicted)    # fetched again if it scrolls back into view
+
+        cell = self.index(row, 0)
+        self.dataChanged.emit(cell, cell, [Qt.ItemDataRole.DecorationRole])
+
+
+def make_proxy(model: ResultsTableModel) -> QSortFilterProxyModel:
+    """Sorting on the typed values and case insensitive filtering over every column, done in the model"""
+    proxy = QSortFilterProxyModel()
+    proxy.setSourceModel(model)
+    proxy.setSortRole(Qt.ItemDataRole.UserRole)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    return proxy
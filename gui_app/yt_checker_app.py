@@ -1,13 +1,15 @@
-from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QTextEdit
+from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QTextEdit, QTableView, QHeaderView, QAbstractItemView
 from PyQt6.QtGui import QIcon, QPixmap
 from PyQt6.QtCore import Qt
 import sys
-import re
 import logging
+from typing import Optional
 
 
 from gui_app.app_button_handler import AppButtonHandler
+from gui_app.results_table import ResultsTableModel, make_proxy
 import youtube_find.constant as CONST
+from youtube_find.canonical import canonical_video_id, canonical_watch_url
 
 youtube_logger = logging.getLogger('youtube_find.youtube_checker')
 
@@ -54,6 +56,10 @@ class YoutubeCheckerApp(QWidget):
         self.comment_button = QPushButton('Commnet', self)
         self.next_video_button = QPushButton('Next Video', self)
         
+        # Several urls separated by spaces / commas, shown in the results table
+        self.batch_button = QPushButton('Batch Retrieve', self)
+        self.batch_button.clicked.connect(self.button_pressed)
+        
         
         # action buttons
         self.action_buttons = [
@@ -89,6 +95,28 @@ class YoutubeCheckerApp(QWidget):
         self.label_button_list.addItems(label_buttons)
         self.label_button_list.clicked.connect(self.button_pressed)
         self.label_button_list.setDisabled(True)
+        
+        
+        # Batch results: only the visible rows are painted, sorting / filtering happen in the proxy
+        self.results_model = ResultsTableModel(parent=self)
+        self.results_proxy = make_proxy(self.results_model)
+        
+        self.results_filter = QLineEdit(self)
+        self.results_filter.setPlaceholderText('Filter results')
+        self.results_filter.textChanged.connect(self.results_proxy.setFilterFixedString)
+        self.results_filter.hide()
+        
+        self.results_table = QTableView(self)
+        self.results_table.setModel(self.results_proxy)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_table.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        # Fixed row height so the view never measures every row
+        self.results_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_table.verticalHeader().setDefaultSectionSize(40)
+        self.results_table.hide()
 
     
     def set_layout(self) -> None:
@@ -115,6 +143,8 @@ class YoutubeCheckerApp(QWidget):
         # Middle part of the bottom half
         middle_bottom_half = QVBoxLayout()
         middle_bottom_half.addWidget(self.text_area)
+        middle_bottom_half.addWidget(self.results_filter)
+        middle_bottom_half.addWidget(self.results_table)
         middle_bottom_half.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         
@@ -128,6 +158,7 @@ class YoutubeCheckerApp(QWidget):
         for button in self.action_buttons:
             if button not in (self.back_button, self.forward_button, self.refresh_button):
                 right_side_bottom_half.addWidget(button)
+        right_side_bottom_half.addWidget(self.batch_button)
      
 
         
@@ -234,16 +265,11 @@ class YoutubeCheckerApp(QWidget):
 
     @staticmethod
     def is_valid_url(url: str) -> bool:
-        if not url:
-            return False
-        
-        pattern = r'^(?:https?://(?:www\.)?youtube\.com/watch\?v=)?([a-zA-Z0-9_-]{11})$'
-        match = re.match(pattern, url)
-        return bool(match)
+        return canonical_video_id(url) is not None
         
     @staticmethod
-    def format_url(url: str) -> str:
-        pass
+    def format_url(url: str) -> Optional[str]:
+        return canonical_watch_url(url)
         
     
 if __name__ == '__main__':
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from youtube_find.process_pool import ShardedRunner
+
+HANGING_ID = 'hangForever'
+
+
+class FakeChecker:
+    def retrieve_infos(self, url):
+        if url.endswith(HANGING_ID):
+            time.sleep(3600)
+        return {'Video URL': url}
+
+    def close(self):
+        pass
+
+
+def fake_checker_factory():
+    return FakeChecker()
+
+
+def test_hung_worker_is_restarted_and_run_finishes():
+    # A single worker: the run can only finish if the hung one is really gone and respawned
+    runner = ShardedRunner(workers=1, checker_factory=fake_checker_factory, task_timeout=2, max_attempts=2)
+    ids = [HANGING_ID, 'aaaaaaaaaaa', 'bbbbbbbbbbb']
+    results = {}
+
+    thread = threading.Thread(target=lambda: results.update(runner.run(ids)), daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+
+    assert not thread.is_alive(), 'run() did not return'
+    assert results[HANGING_ID] is None
+    for video_id in ids[1:]:
+        assert results[video_id] == {'Video URL': 'https://www.youtube.com/watch?v=' + video_id}
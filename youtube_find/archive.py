@@ -0,0 +1,411 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import youtube_find.canonical as canonical
+import youtube_find.records as records
+from youtube_find.channel_cache import ChannelInfo
+from youtube_find.extraction import RecordedElement, WatchPageExtractor, _lookup_key
+from youtube_find.locators import CSS, SelectorRegistry
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+class SnapshotArchive:
+    """
+    Compressed, content-addressed store of fetched watch pages.
+
+    Pages are gzipped under objects/<2 hex>/<sha256>.html.gz, so identical pages are
+    stored once; index.jsonl maps every video id to the digests recorded for it.
+    The raw lookups extracted from a page are kept next to it as <sha256>.lookups.json.gz,
+    replaying them is much cheaper than parsing the page again.
+
+    Attributes:
+        root (str): Directory of the archive
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Args:
+            root: Directory of the archive, created if needed
+        """
+        self.root = root
+        self._index_path = os.path.join(root, 'index.jsonl')
+        self._latest: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._load_index()
+
+
+    def record(self, video_id: str, html: str, url: Optional[str] = None,
+               lookups: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store the raw page of a video.
+
+        Args:
+            video_id: Id the page is recorded under
+            html: The rendered page
+            url: The url the page was opened with
+            lookups: The raw lookups extracted from the page, see `WatchPageExtractor.recorded_page_infos`
+
+        Returns:
+            The sha256 digest the page is stored under
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+
+        self._write_object(path, data)
+        if lookups is not None:
+            self._write_object(self._lookups_path(digest), json.dumps(lookups).encode('utf-8'))
+
+        entry = {'video_id': video_id, 'sha256': digest, 'url': url, 'fetched_at': time.time()}
+        with self._lock:
+            with open(self._index_path, 'a') as index:
+                index.write(json.dumps(entry) + '\n')
+            self._latest[video_id] = digest
+        return digest
+
+
+    def load(self, video_id: str) -> Optional[str]:
+        """Return the latest recorded page of the video, None if it was never recorded"""
+        digest = self._latest.get(video_id)
+        if digest is None:
+            return None
+        with gzip.open(self._object_path(digest), 'rb') as file:
+            return file.read().decode('utf-8')
+
+
+    def load_lookups(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return the lookups recorded with the latest page of the video, None if there are none"""
+        digest = self._latest.get(video_id)
+        if digest is None:
+            return None
+        try:
+            with gzip.open(self._lookups_path(digest), 'rb') as file:
+                return json.loads(file.read().decode('utf-8'))
+        except FileNotFoundError:
+            return None     # recorded without lookups
+
+
+    def video_ids(self) -> List[str]:
+        return list(self._latest)
+
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._latest
+
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.html.gz')
+
+
+    def _lookups_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.lookups.json.gz')
+
+
+    @staticmethod
+    def _write_object(path: str, data: bytes) -> None:
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(temporary, 'wb', compresslevel=6) as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, 'r') as index:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue    # torn last line after a crash
+                self._latest[entry['video_id']] = entry['sha256']
+
+
+_VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'))
+_TEXTLESS_TAGS = frozenset(('script', 'style', 'template'))
+
+# One compound selector: tag, #id, .class and [attr] / [attr="value"] parts
+_COMPOUND_TOKEN_RE = re.compile(r'(?:[^\s\[]+|\[[^\]]*\])+')
+_COMPOUND_PART_RE = re.compile(r'#([\w-]+)|\.([\w-]+)|\[\s*([\w:-]+)\s*(?:=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]*)))?\s*\]')
+_TAG_RE = re.compile(r'^([A-Za-z*][\w-]*)')
+
+
+class _Node:
+    """Element of a recorded page, with the two WebElement members the getters use"""
+
+    __slots__ = ('tag', 'attributes', 'parent', 'children')
+
+    def __init__(self, tag: str, attributes: Dict[str, Optional[str]], parent: Optional['_Node']) -> None:
+        self.tag = tag
+        self.attributes = attributes
+        self.parent = parent
+        self.children: List[Any] = []      # _Node or str
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self.attributes.get(name)
+
+    @property
+    def text(self) -> str:
+        parts: List[str] = []
+        stack: List[Any] = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in _TEXTLESS_TAGS:
+                stack.extend(reversed(node.children))
+        lines = (' '.join(line.split()) for line in ''.join(parts).splitlines())
+        return '\n'.join(line for line in lines if line)
+
+
+class _DocumentParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = _Node('#document', {}, None)
+        self.elements: List[_Node] = []        # document order
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        node = _Node(tag, dict(attrs), self._stack[-1])
+        self._stack[-1].children.append(node)
+        self.elements.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        node = _Node(tag, dict(attrs), self._stack[-1])
+        self._stack[-1].children.append(node)
+        self.elements.append(node)
+
+    def handle_endtag(self, tag: str) -> None:
+        for depth in range(len(self._stack) - 1, 0, -1):
+            if self._stack[depth].tag == tag:
+                del self._stack[depth:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        self._stack[-1].children.append(data)
+
+
+def _parse_compound(token: str) -> Optional[Tuple[Optional[str], List[Tuple[str, str, Optional[str]]]]]:
+    """(tag, [(kind, name, value)]) of a compound selector, None if it uses unsupported syntax"""
+    match = _TAG_RE.match(token)
+    tag = match.group(1).lower() if match else None
+    position = match.end() if match else 0
+    conditions = []
+    while position < len(token):
+        part = _COMPOUND_PART_RE.match(token, position)
+        if not part:
+            return None
+        element_id, class_name, attribute = part.group(1), part.group(2), part.group(3)
+        if element_id:
+            conditions.append(('attribute', 'id', element_id))
+        elif class_name:
+            conditions.append(('class', 'class', class_name))
+        else:
+            value = next((group for group in part.group(4, 5, 6) if group is not None), None)
+            conditions.append(('attribute', attribute, value))
+        position = part.end()
+    return (None if tag == '*' else tag), conditions
+
+
+def _matches(node: _Node, compound) -> bool:
+    tag, conditions = compound
+    if tag and node.tag != tag:
+        return False
+    for kind, name, value in conditions:
+        actual = node.attributes.get(name)
+        if kind == 'class':
+            if not actual or value not in actual.split():
+                return False
+        elif actual is None or (value is not None and actual != value):
+            return False
+    return True
+
+
+def select_first(elements: List[_Node], selector: str) -> Optional[_Node]:
+    """
+    First element matching a CSS selector made of compound selectors and descendant
+    combinators, which is all the registry's locators use. Other syntax matches nothing.
+    """
+    compounds = [_parse_compound(token) for token in _COMPOUND_TOKEN_RE.findall(selector)]
+    if not compounds or None in compounds:
+        return None
+
+    *ancestors, last = compounds
+    for node in elements:
+        if not _matches(node, last):
+            continue
+        remaining = len(ancestors) - 1
+        parent = node.parent
+        while remaining >= 0 and parent is not None:
+            if _matches(parent, ancestors[remaining]):
+                remaining -= 1
+            parent = parent.parent
+        if remaining < 0:
+            return node
+    return None
+
+
+_PLAYER_RESPONSE_RE = re.compile(r'ytInitialPlayerResponse\s*=\s*')
+
+
+class ArchivedPage(WatchPageExtractor):
+    """
+    A recorded page run through the same getters as YoutubeChecker, no browser.
+    The page is the rendered DOM saved after extraction, so the UI counts (likes,
+    comments, subscribers) are read from it with the registry's CSS locators.
+    """
+
+    def __init__(self, html: str, selectors: Optional[SelectorRegistry] = None) -> None:
+        """
+        Args:
+            html: The recorded page
+            selectors: Locator registry, the default locators by default
+        """
+        parser = _DocumentParser()
+        parser.feed(html)
+        parser.close()
+        self.elements = parser.elements
+        self.selectors = selectors or SelectorRegistry(path=None)
+        self.player_response = self._player_response(html)
+
+
+    def _get_element_attribute(self, name: str, attribute: str = None, wait_time: int = 0) -> None | str | _Node:
+        for locator in self.selectors.candidates(name):
+            if locator.kind != CSS:
+                continue
+            element = select_first(self.elements, locator.value)
+            if element is not None:
+                return element.get_attribute(attribute) if attribute else element
+        return None
+
+
+    def player_details(self) -> Optional[Dict[str, Any]]:
+        details = self.player_response.get('videoDetails')
+        if not details:
+            return None
+        # Only the first video of a browsing session has its own ytInitialPlayerResponse
+        expected = canonical.canonical_video_id(self.url())
+        if expected and details.get('videoId') != expected:
+            return None
+        return details
+
+
+    def _description_text_from_dom(self) -> Optional[str]:
+        element = self._get_element_attribute('description_text')
+        if element:
+            return element.text.strip()
+
+
+    def _comment_count_element(self) -> Optional[_Node]:
+        return self._get_element_attribute('comment_count')
+
+
+    def retrieve_infos(self) -> Dict[str, Any]:
+        """Same keys as `YoutubeChecker.retrieve_infos`"""
+        return self.page_infos()
+
+
+    @staticmethod
+    def _player_response(html: str) -> Dict[str, Any]:
+        match = _PLAYER_RESPONSE_RE.search(html)
+        if not match:
+            return {}
+        try:
+            value, _ = json.JSONDecoder().raw_decode(html, match.end())
+        except ValueError:
+            return {}
+        return value if isinstance(value, dict) else {}
+
+
+class RecordedPage(WatchPageExtractor):
+    """The lookups recorded with a page run through the same getters, without parsing the page"""
+
+    def __init__(self, lookups: Dict[str, Any]) -> None:
+        """
+        Args:
+            lookups: As returned by `WatchPageExtractor.recorded_page_infos`
+        """
+        self.lookups = lookups
+
+
+    def _get_element_attribute(self, name: str, attribute: str = None, wait_time: int = 0) -> None | str | RecordedElement:
+        return self._recorded(_lookup_key(name, attribute), element=not attribute)
+
+
+    def player_details(self) -> Optional[Dict[str, Any]]:
+        return self.lookups.get('player_details')
+
+
+    def _description_text_from_dom(self) -> Optional[str]:
+        return self.lookups.get('description_dom')
+
+
+    def _comment_count_element(self) -> Optional[RecordedElement]:
+        return self._recorded('comment_count', element=True)
+
+
+    def channel_infos(self) -> ChannelInfo:
+        channel = self.lookups.get('channel')
+        if channel is None:
+            return super().channel_infos()
+        channel_id, name, sub_count = channel
+        return ChannelInfo(channel_id, name, sub_count, records.parse_count(sub_count))
+
+
+    def retrieve_infos(self) -> Dict[str, Any]:
+        """Same keys as `YoutubeChecker.retrieve_infos`"""
+        return self.page_infos()
+
+
+    def _recorded(self, key: str, element: bool) -> None | str | RecordedElement:
+        value = self.lookups.get(key)
+        if element and value is not None:
+            return RecordedElement(value)
+        return value
+
+
+def replay(archive: SnapshotArchive, video_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Run the extraction on recorded pages, without browser or network.
+    The recorded lookups are used when there are some, the page is parsed otherwise.
+
+    Yields:
+        (video_id, infos) for every requested id, infos is None if the id was never recorded
+        or its page could not be read
+    """
+    for video_id in video_ids if video_ids is not None else archive.video_ids():
+        try:
+            lookups = archive.load_lookups(video_id)
+            if lookups is not None:
+                yield video_id, RecordedPage(lookups).retrieve_infos()
+                continue
+
+            html = archive.load(video_id)
+            yield video_id, ArchivedPage(html).retrieve_infos() if html is not None else None
+        except Exception as e:
+            youtube_logger.exception(f'Could not replay {video_id}: {e}')
+            yield video_id, None
+
+
+def replay_records(archive: SnapshotArchive, video_ids: Optional[List[str]] = None) -> List[records.VideoRecord]:
+    """Replay the archive straight into typed VideoRecords"""
+    return records.normalize_many(infos for _, infos in replay(archive, video_ids))
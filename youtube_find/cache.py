@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache whose entries also expire after `ttl` seconds.
+    
+    Attributes:
+        max_size (int): Entries kept before the least recently used one is evicted
+        ttl (float): Seconds an entry stays valid, None to never expire
+    """
+    
+    def __init__(self, max_size: int = 10_000, ttl: Optional[float] = 3600) -> None:
+        """
+        Args:
+            max_size: Entries kept before the least recently used one is evicted
+            ttl: Seconds an entry stays valid, None to never expire
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+    
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+    
+    
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING) -> None:
+        """Store `value`, `ttl` overrides the cache's own for this entry"""
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,119 @@
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import youtube_find.constant as CONST
+
+
+_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_PATH_ID_RE = re.compile(r'^/(?:shorts|embed|live|v|e)/([A-Za-z0-9_-]{11})(?:[/?#]|$)')
+_YOUTUBE_HOSTS = {
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+    'youtube-nocookie.com', 'www.youtube-nocookie.com',
+}
+
+
+def canonical_video_id(url: Optional[str]) -> Optional[str]:
+    """
+    Map any kind of YouTube video link to its 11 characters video id.
+
+    Handles bare ids, youtube.com/watch?v= (with &t=, &list=... in any order), youtu.be/,
+    /shorts/, /embed/, /live/, m. and music. hosts, with or without scheme.
+
+    Returns:
+        The video id, None if the input is not a video link
+    """
+    if not url:
+        return None
+
+    url = url.strip()
+    if _VIDEO_ID_RE.match(url):
+        return url
+
+    if '://' not in url:
+        url = 'https://' + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+
+    if host in ('youtu.be', 'www.youtu.be'):
+        candidate = parsed.path.lstrip('/').split('/')[0]
+        return candidate if _VIDEO_ID_RE.match(candidate) else None
+
+    if host not in _YOUTUBE_HOSTS:
+        return None
+
+    if parsed.path in ('/watch', '/watch/'):
+        candidate = parse_qs(parsed.query).get('v', [''])[0]
+        return candidate if _VIDEO_ID_RE.match(candidate) else None
+
+    match = _PATH_ID_RE.match(parsed.path)
+    return match.group(1) if match else None
+
+
+def canonical_watch_url(url: Optional[str]) -> Optional[str]:
+    """Return the plain watch url of the video, None if the input is not a video link"""
+    video_id = canonical_video_id(url)
+    if video_id:
+        return CONST.youtube_watch_url + video_id
+    return None
+
+
+def dedupe(urls: Iterable[str]) -> List[str]:
+    """Canonical ids of the inputs, first occurrence order kept, invalid inputs dropped"""
+    seen = {}
+    for url in urls:
+        video_id = canonical_video_id(url)
+        if video_id:
+            seen.setdefault(video_id, None)
+    return list(seen)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key: the first caller runs the function,
+    the others wait for it and share its result (or its exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,82 @@
+from typing import Callable, NamedTuple, Optional
+
+from youtube_find.cache import TTLCache
+from youtube_find.canonical import SingleFlight
+import youtube_find.records as records
+
+
+class ChannelInfo(NamedTuple):
+    channel_id: str
+    name: Optional[str]
+    sub_count: Optional[str]            # as displayed, e.g. '1.2M'
+    sub_count_value: Optional[int]      # parsed, e.g. 1200000
+
+
+class ChannelCache:
+    """
+    Channel metadata shared by all the videos of a batch, keyed by channel id.
+    
+    Attributes:
+        max_size (int): Channels kept before the least recently used one is evicted
+        ttl (float): Seconds before a channel is scraped again
+        partial_ttl (float): Seconds a channel missing its subscriber count is kept
+    """
+    
+    def __init__(self, max_size: int = 1000, ttl: float = 6 * 3600, partial_ttl: float = 300) -> None:
+        """
+        Args:
+            max_size: Channels kept before the least recently used one is evicted
+            ttl: Seconds before a channel is scraped again
+            partial_ttl: Seconds a channel missing its subscriber count is kept. Short, the lookup may
+                         just have timed out, but not zero: some channels hide their count for good
+        """
+        self.partial_ttl = partial_ttl
+        self._cache = TTLCache(max_size, ttl)
+        self._inflight = SingleFlight()
+    
+    
+    def get(self, channel_id: str) -> Optional[ChannelInfo]:
+        return self._cache.get(channel_id)
+    
+    
+    def put(self, channel_id: str, name: Optional[str], sub_count: Optional[str]) -> ChannelInfo:
+        info = ChannelInfo(channel_id, name, sub_count, records.parse_count(sub_count))
+        # Do not pin a failed scrape for a whole TTL
+        if name is not None and sub_count is not None:
+            self._cache.set(channel_id, info)
+        elif name is not None:
+            self._cache.set(channel_id, info, ttl=self.partial_ttl)
+        return info
+    
+    
+    def resolve(self, channel_id: str, scrape: Callable[[], tuple]) -> ChannelInfo:
+        """
+        Return the cached channel, or scrape it once (concurrent callers share the scrape).
+        
+        Args:
+            channel_id: Id of the channel (UC...)
+            scrape: Returns (name, sub_count) of the channel from the current page
+        """
+        info = self.get(channel_id)
+        if info is not None:
+            return info
+        
+        def load() -> ChannelInfo:
+            name, sub_count = scrape()
+            return self.put(channel_id, name, sub_count)
+        
+        return self._inflight.do(channel_id, load)
+    
+    
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+    
+    
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+    
+    
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -2,4 +2,8 @@ base_url = 'https://www.youtube.com'
 
 youtube_watch_url = 'https://www.youtube.com/watch?v='
 
-webdriver_path = 'D:\Study\Programming\WebDrivers\msedgedriver.exe'
\ No newline at end of file
+webdriver_path = 'D:\Study\Programming\WebDrivers\msedgedriver.exe'
+
+youtube_playlist_url = 'https://www.youtube.com/playlist?list='
+
+selector_stats_path = 'logs/selector_stats.json'
@@ -2,7 +2,6 @@ import logging
 from typing import Callable
 from functools import wraps
 from selenium.common.exceptions import TimeoutException
-import traceback
 youtube_logger = logging.getLogger('youtube_find.youtube_checker')
 
 
@@ -13,10 +12,19 @@ def error_handle(func: Callable):
         except TimeoutException as e:
             # Log TimeoutException with a custom message
             youtube_logger.error(f'{func.__name__} - Element not found within the given time:\n {e}')
+            _note_timeout(args)
             return None
         except Exception as e:
-            # Log all other exceptions with a stack trace
-            youtube_logger.exception(f'Error in {func.__name__} with args={args}, kwargs={kwargs}: {e}')
-            youtube_logger.exception(f"Stack Trace:\n{traceback.format_exc()}")
+            # Log all other exceptions once with a stack trace, args are left out as they hold the whole driver
+            youtube_logger.exception(f'Error in {func.__name__}: {e}')
             raise
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def _note_timeout(args) -> None:
+    """Feed the driver recycler of the YoutubeChecker the method was called on, if any"""
+    owner = args[0] if args else None
+    driver = getattr(owner, 'driver', owner)     # YTAction keeps the checker as .driver
+    recycler = getattr(driver, 'recycler', None)
+    if recycler is not None:
+        recycler.note_timeout()
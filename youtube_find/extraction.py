@@ -0,0 +1,245 @@
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import youtube_find.decorators as decorators
+import youtube_find.records as records
+from youtube_find.channel_cache import ChannelInfo
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+class RecordedElement(NamedTuple):
+    """An element as the getters see it once its text was recorded"""
+    text: str
+
+
+class WatchPageExtractor:
+    """
+    The field getters of a watch page, written once on top of a few lookups.
+
+    YoutubeChecker implements the lookups on the live browser, ArchivedPage on a recorded
+    page, so a parsing fix made here applies to both retrieval and replay.
+
+    Lookups a subclass provides:
+        _get_element_attribute(name, attribute=None): element registered as `name`, or its attribute
+        player_details(): videoDetails of the embedded player data, None if missing
+        _description_text_from_dom(): description when the player data has none
+        _comment_count_element(): element holding the comment count, None if missing
+
+    `recorded_page_infos` also returns the raw values every getter was computed from,
+    `archive.RecordedPage` runs the getters again on them.
+    """
+
+    _lookups: Optional[Dict[str, Any]] = None
+
+    def _get_element_attribute(self, name: str, attribute: str = None, wait_time: int = 7):
+        raise NotImplementedError
+
+
+    def player_details(self) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+    def _description_text_from_dom(self) -> Optional[str]:
+        raise NotImplementedError
+
+
+    def _comment_count_element(self):
+        raise NotImplementedError
+
+
+    def _lookup(self, name: str, attribute: str = None):
+        """`_get_element_attribute`, remembering the raw value while `recorded_page_infos` runs"""
+        found = self._get_element_attribute(name, attribute)
+        if attribute:
+            return self._remember(_lookup_key(name, attribute), found)
+        return self._remember_element(name, found)
+
+
+    def _remember(self, key: str, value: Any) -> Any:
+        if self._lookups is not None:
+            self._lookups[key] = value
+        return value
+
+
+    def _remember_element(self, key: str, element):
+        """Record the text of the element, the getters then read it from the record instead of the page"""
+        if self._lookups is None:
+            return element
+        text = self._remember(key, element.text if element else None)
+        return RecordedElement(text) if text is not None else None
+
+
+    def _element_text(self, name: str) -> Optional[str]:
+        element = self._lookup(name)
+        if element:
+            return element.text
+
+
+    def title(self) -> Optional[str]:
+        """Retrive the title of the video"""
+        return self._element_text('title')
+
+
+    def url(self) -> Optional[str]:
+        """Retrive the url of the video"""
+        return self._lookup('og_url', 'content')
+
+
+    def like_count(self) -> Optional[int]:
+        """Retrive the like count as an integer"""
+        return records.parse_count(self._lookup('like_button', 'aria-label'))
+
+
+    def view_count(self) -> Optional[int]:
+        """Retrive the view count as an integer"""
+        view_count = self._lookup('view_count', 'content')
+        if view_count:
+            return int(view_count)
+
+
+    def date_upload(self) -> Optional[str]:
+        """Retrive the upload date of the video"""
+        return self._lookup('upload_date', 'content')
+
+
+    def date_publised(self) -> Optional[str]:
+        """Retrive the publised date of the video"""
+        return self._lookup('date_published', 'content')
+
+
+    def video_is_family_friendly(self) -> bool:
+        """Check if youtube family friendly meta tag is 'true'"""
+        friendly = self._lookup('family_friendly', 'content')
+        if friendly:
+            return friendly.lower() == 'true'
+
+
+    def description_text(self) -> Optional[str]:
+        """Retrive the full text of the description, from the embedded player data when possible"""
+        details = self._remember('player_details', self.player_details())
+        if details and details.get('shortDescription') is not None:
+            return details['shortDescription'].strip()
+
+        return self._remember('description_dom', self._description_text_from_dom())
+
+
+    def video_length(self) -> Optional[str]:
+        """Return the formatted video length"""
+        vid_length = self._lookup('duration', 'content')
+        if vid_length:
+            return records.format_duration(records.parse_duration(vid_length))
+
+
+    def channel_name(self) -> Optional[str]:
+        """Get the channel name"""
+        return self._element_text('channel_name')
+
+
+    def channel_infos(self) -> ChannelInfo:
+        """Name and subscriber count of the video's channel"""
+        details = self.player_details() or {}
+        sub_count = self.sub_count()
+        return ChannelInfo(details.get('channelId'), self.channel_name(), sub_count, records.parse_count(sub_count))
+
+
+    def comment_count(self) -> Optional[int]:
+        """Retrive the comment count as an integer"""
+        element = self._remember_element('comment_count', self._comment_count_element())
+        if element:
+            return records.parse_count(element.text.split(' ')[0])
+
+
+    def sub_count(self) -> Optional[str]:
+        """Get the subcriber count of the channel"""
+        sub_count = self._lookup('sub_count')
+        if sub_count:
+            return sub_count.text.split(' ')[0]
+
+
+    def thumbnail(self) -> Optional[str]:
+        """Retrive the thumnail url of the video"""
+        return self._lookup('og_image', 'content')
+
+
+    def video_genre(self) -> Optional[str]:
+        """Get the genre of the video"""
+        return self._lookup('genre', 'content')
+
+
+    def keywords_tags(self) -> List[str]:
+        keywords = self._lookup('keywords', 'content')
+        if keywords:
+            return keywords.split(',')
+
+
+    def regions_allowed(self) -> List[str]:
+        regions_allowed = self._lookup('regions_allowed', 'content')
+        if regions_allowed:
+            return regions_allowed.split(',')
+
+
+    @decorators.error_handle
+    def banned_regions(self) -> List[str]:
+        allowed_regions = self.regions_allowed()
+        if allowed_regions is None:
+            return None
+        allowed_regions = set(allowed_regions)
+        banned_regions = []
+
+        try:
+            with open("Tags.txt", "r") as file:
+                all_regions = file.read().splitlines()
+                for region in all_regions:
+                    if region not in allowed_regions:
+                        banned_regions.append(region)
+
+        except FileNotFoundError:
+            youtube_logger.error("Error: Tags.txt file not found.")
+            raise
+
+        return banned_regions
+
+
+    def page_infos(self) -> Dict[Any, Any]:
+        """All the infos of the page, keyed like `YoutubeChecker.retrieve_infos`"""
+        channel = self.channel_infos()
+        self._remember('channel', [channel.channel_id, channel.name, channel.sub_count])
+
+        return {
+            'Title' : self.title(),
+            'Video Length' : self.video_length(),
+            'View Count' : self.view_count(),
+            'Like Count' : self.like_count(),
+            'Comment Count' : self.comment_count(),
+            'Upload Date' : self.date_upload(),
+            'Date Published' : self.date_publised(),
+            'ChannelName' : channel.name,
+            'Sub Count' : channel.sub_count,
+            'Description' : self.description_text(),
+            'Video URL' : self.url(),
+            'Thumbnail' : self.thumbnail(),
+            'Family Friendly' : self.video_is_family_friendly(),
+            'Video Genre' : self.video_genre(),
+            'KeyWords' : self.keywords_tags(),
+            'Banned Regions' : self.banned_regions(),
+            'Allowed Regions' : self.regions_allowed()
+        }
+
+
+    def recorded_page_infos(self) -> Tuple[Dict[Any, Any], Dict[str, Any]]:
+        """
+        `page_infos` along with the raw lookups it was computed from.
+
+        Returns:
+            Tuple of (infos, lookups), the lookups are JSON serializable
+        """
+        self._lookups = {}
+        try:
+            return self.page_infos(), self._lookups
+        finally:
+            self._lookups = None
+
+
+def _lookup_key(name: str, attribute: Optional[str]) -> str:
+    return f'{name}@{attribute}' if attribute else name
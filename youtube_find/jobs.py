@@ -0,0 +1,362 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import youtube_find.constant as CONST
+import youtube_find.canonical as canonical
+import youtube_find.log_setup as log_setup
+import youtube_find.records as records
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    video_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+
+def default_owner() -> str:
+    """host:pid, unique among the workers sharing one queue file"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class JobQueue:
+    """
+    Durable queue of video ids kept in one SQLite file, so a batch survives crashes
+    and is resumed where it stopped.
+
+    Every id is pending, leased, done or failed. A worker leases ids for a limited time;
+    if it dies, the lease expires and the ids become pending again. Results are stored
+    with the id, so done ids are never scraped twice.
+
+    Several processes on one host can share the file. To share it between machines, open it
+    with shared=True: WAL mode keeps its index in shared memory of a single host, so the
+    rollback journal is used instead, and the filesystem must honour SQLite locking
+    (many network shares do not).
+
+    Attributes:
+        path (str): The SQLite file
+        max_attempts (int): Leases an id gets before it is marked failed
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, busy_timeout: float = 30, shared: bool = False) -> None:
+        """
+        Args:
+            path: The SQLite file, created if needed
+            max_attempts: Leases an id gets before it is marked failed
+            busy_timeout: Seconds to wait for another process holding the write lock
+            shared: The file is used from several machines: rollback journal instead of WAL.
+                    Every process opening the file must agree on this
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.journal_mode = 'DELETE' if shared else 'WAL'
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit, transactions are opened explicitly
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute(f'PRAGMA journal_mode={self.journal_mode}')
+            # NORMAL is only durable enough with WAL, the rollback journal needs FULL
+            self._connection.execute('PRAGMA synchronous=' + ('NORMAL' if self.journal_mode == 'WAL' else 'FULL'))
+            self._connection.executescript(_SCHEMA)
+
+
+    def add(self, urls: Iterable[str]) -> int:
+        """
+        Queue videos, ids already in the queue keep their state and result.
+
+        Args:
+            urls: Any kind of video links or ids
+
+        Returns:
+            Number of newly queued ids
+        """
+        now = time.time()
+        rows = [(video_id, now) for video_id in canonical.dedupe(urls)]
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany('INSERT OR IGNORE INTO jobs (video_id, updated_at) VALUES (?, ?)', rows)
+            return connection.total_changes - before
+
+
+    def lease(self, owner: str, count: int = 1, lease_seconds: float = 300) -> List[str]:
+        """
+        Take up to `count` pending ids for `lease_seconds`. Expired leases are reclaimed first.
+
+        Returns:
+            The leased ids, empty when nothing is pending
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            self._reclaim_expired(connection, now)
+            video_ids = [row[0] for row in connection.execute(
+                'SELECT video_id FROM jobs WHERE state = ? ORDER BY attempts, rowid LIMIT ?', (PENDING, count)
+            )]
+            connection.executemany(
+                'UPDATE jobs SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? '
+                'WHERE video_id = ?',
+                [(LEASED, owner, now + lease_seconds, now, video_id) for video_id in video_ids],
+            )
+        return video_ids
+
+
+    def renew(self, owner: str, video_ids: Iterable[str], lease_seconds: float = 300) -> List[str]:
+        """
+        Extend leases still held by `owner`.
+
+        Returns:
+            The ids whose lease was extended, the others were lost to another worker
+        """
+        now = time.time()
+        renewed = []
+        with self._transaction() as connection:
+            for video_id in video_ids:
+                cursor = connection.execute(
+                    'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE video_id = ? AND state = ? AND lease_owner = ?',
+                    (now + lease_seconds, now, video_id, LEASED, owner),
+                )
+                if cursor.rowcount:
+                    renewed.append(video_id)
+        return renewed
+
+
+    def complete(self, owner: str, video_id: str, result: Optional[Dict[Any, Any]]) -> bool:
+        """
+        Store the result of a leased id and mark it done.
+
+        Returns:
+            False if the lease was lost meanwhile, the result is then dropped
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE jobs SET state = ?, result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+                'WHERE video_id = ? AND state = ? AND lease_owner = ?',
+                (DONE, json.dumps(result, ensure_ascii=False, default=str), time.time(), video_id, LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+
+    def fail(self, owner: str, video_id: str, error: str) -> bool:
+        """
+        Give a leased id back: pending again, or failed once it used all its attempts.
+
+        Returns:
+            False if the lease was lost meanwhile
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, '
+                'lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+                'WHERE video_id = ? AND state = ? AND lease_owner = ?',
+                (self.max_attempts, FAILED, PENDING, error, time.time(), video_id, LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+
+    def retry_failed(self) -> int:
+        """Put every failed id back to pending with fresh attempts, returns how many"""
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE jobs SET state = ?, attempts = 0, updated_at = ? WHERE state = ?', (PENDING, time.time(), FAILED)
+            )
+            return cursor.rowcount
+
+
+    def results(self) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """Infos of every done id"""
+        with self._lock:
+            rows = self._connection.execute('SELECT video_id, result FROM jobs WHERE state = ?', (DONE,)).fetchall()
+        return {video_id: json.loads(result) for video_id, result in rows}
+
+
+    def stats(self) -> Dict[str, int]:
+        """Number of ids in every state"""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            for state, count in self._connection.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'):
+                counts[state] = count
+        return counts
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+    def _reclaim_expired(self, connection: sqlite3.Connection, now: float) -> None:
+        """Leases of dead workers: pending again, or failed if the crash used their last attempt"""
+        connection.execute(
+            'UPDATE jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, '
+            'lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+            'WHERE state = ? AND lease_expires < ?',
+            (self.max_attempts, FAILED, PENDING, 'lease expired', now, LEASED, now),
+        )
+
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE takes the write lock up front, so two workers can never lease the same id"""
+
+    def __init__(self, queue: JobQueue) -> None:
+        self.queue = queue
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.queue._lock.acquire()
+        try:
+            self.queue._connection.execute('BEGIN IMMEDIATE')
+        except Exception:
+            self.queue._lock.release()
+            raise
+        return self.queue._connection
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.queue._connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.queue._lock.release()
+
+
+class _LeaseHeartbeat:
+    """Renew one lease in the background while its video is being retrieved"""
+
+    def __init__(self, jobs: JobQueue, owner: str, video_id: str, lease_seconds: float) -> None:
+        self.jobs = jobs
+        self.owner = owner
+        self.video_id = video_id
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'lease-{video_id}', daemon=True)
+
+    def __enter__(self) -> '_LeaseHeartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        # Renew well before expiry, a late renewal would let another worker take the video
+        while not self._stopped.wait(self.lease_seconds / 3):
+            try:
+                if not self.jobs.renew(self.owner, [self.video_id], self.lease_seconds):
+                    youtube_logger.warning(f'Lease of {self.video_id} was lost while retrieving it')
+                    return
+            except sqlite3.Error as e:
+                youtube_logger.error(f'Could not renew the lease of {self.video_id}: {e}')
+
+
+def run_worker(jobs: JobQueue, checker, owner: Optional[str] = None, lease_seconds: float = 300,
+               limit: Optional[int] = None) -> int:
+    """
+    Lease ids one at a time and retrieve them until the queue is drained.
+    Every result is committed as soon as it is scraped, so a crash loses at most the
+    video in progress, which is leased again once its lease expires.
+
+    Args:
+        jobs: The queue to drain
+        checker: Object with `retrieve_infos(url)`, e.g. a YoutubeChecker
+        owner: Name of this worker in the leases, host:pid by default
+        lease_seconds: Lease length, renewed while the video is retrieved, so it is only the time
+                       after a crash before another worker takes the video over
+        limit: Stop after this many videos
+
+    Returns:
+        Number of videos completed by this worker
+    """
+    owner = owner or default_owner()
+    completed = 0
+    while limit is None or completed < limit:
+        leased = jobs.lease(owner, 1, lease_seconds)
+        if not leased:
+            break
+
+        video_id = leased[0]
+        try:
+            with _LeaseHeartbeat(jobs, owner, video_id, lease_seconds):
+                infos = checker.retrieve_infos(CONST.youtube_watch_url + video_id)
+        except Exception as e:
+            youtube_logger.error(f'Job {video_id} failed: {e!r}')
+            jobs.fail(owner, video_id, repr(e))
+            continue
+
+        if infos is None:
+            jobs.fail(owner, video_id, 'no infos')
+        elif not records.mostly_retrieved(infos):
+            # Most lookups timed out, keep it retryable instead of storing an empty result
+            jobs.fail(owner, video_id, 'most fields missing')
+        elif jobs.complete(owner, video_id, infos):
+            completed += 1
+        else:
+            youtube_logger.warning(f'Lease of {video_id} expired before it was completed')
+    return completed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Resumable batch retrieval backed by a SQLite job queue')
+    parser.add_argument('database')
+    parser.add_argument('--add', nargs='*', default=[], help='Video links or ids to queue')
+    parser.add_argument('--add-file', help='File with one link or id per line')
+    parser.add_argument('--run', action='store_true', help='Drain the queue with one browser')
+    parser.add_argument('--retry-failed', action='store_true')
+    parser.add_argument('--lease-seconds', type=float, default=300)
+    parser.add_argument('--shared', action='store_true', help='The database is shared between machines')
+    args = parser.parse_args()
+
+    jobs = JobQueue(args.database, shared=args.shared)
+    try:
+        urls = list(args.add)
+        if args.add_file:
+            with open(args.add_file, 'r') as file:
+                urls.extend(line.strip() for line in file if line.strip())
+        if urls:
+            youtube_logger.info(f'Queued {jobs.add(urls)} new videos')
+        if args.retry_failed:
+            jobs.retry_failed()
+
+        if args.run:
+            from youtube_find.youtube_checker import YoutubeChecker
+            # Other workers may drain the same queue from their own processes
+            log_setup.configure_logging('logs/app.log', level=logging.INFO, per_process=True)
+            checker = YoutubeChecker(CONST.webdriver_path, auto_closing=True)
+            try:
+                run_worker(jobs, checker, lease_seconds=args.lease_seconds)
+            finally:
+                checker.close()
+
+        print(json.dumps(jobs.stats()))
+    finally:
+        jobs.close()
+
+
+if __name__ == '__main__':
+    main()
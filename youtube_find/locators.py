@@ -0,0 +1,320 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+import youtube_find.constant as CONST
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+CSS = 'css'
+XPATH = 'xpath'
+
+
+class Locator(NamedTuple):
+    kind: str       # CSS or XPATH
+    value: str
+
+
+# Every logical element of the pages we touch, with its candidate locators in default order
+DEFAULT_LOCATORS: Dict[str, List[Locator]] = {
+    # Watch page metadata
+    'title': [
+        Locator(CSS, 'h1.ytd-watch-metadata yt-formatted-string'),
+        Locator(XPATH, '//*[@id="title"]/h1/yt-formatted-string'),
+    ],
+    'og_url': [Locator(CSS, 'meta[property="og:url"]')],
+    'og_image': [Locator(CSS, 'meta[property="og:image"]')],
+    'view_count': [Locator(CSS, 'meta[itemprop="interactionCount"]')],
+    'upload_date': [Locator(CSS, 'meta[itemprop="uploadDate"]')],
+    'date_published': [Locator(CSS, 'meta[itemprop="datePublished"]')],
+    'family_friendly': [Locator(CSS, 'meta[itemprop="isFamilyFriendly"]')],
+    'duration': [Locator(CSS, 'meta[itemprop="duration"]')],
+    'genre': [Locator(CSS, 'meta[itemprop="genre"]')],
+    'keywords': [Locator(CSS, 'meta[name="keywords"]')],
+    'regions_allowed': [Locator(CSS, 'meta[itemprop="regionsAllowed"]')],
+    'channel_name': [
+        Locator(CSS, 'ytd-video-owner-renderer #channel-name'),
+        Locator(CSS, '#channel-name'),
+    ],
+    'sub_count': [
+        Locator(CSS, 'ytd-video-owner-renderer #owner-sub-count'),
+        Locator(CSS, '#owner-sub-count'),
+    ],
+    'description_text': [
+        Locator(CSS, '#description-inline-expander yt-attributed-string'),
+        Locator(XPATH, '//*[@id="description-inline-expander"]/yt-attributed-string'),
+    ],
+    'comment_count': [
+        Locator(CSS, 'ytd-comments-header-renderer #count yt-formatted-string span'),
+        Locator(XPATH, '//*[@id="count"]/yt-formatted-string/span[1]'),
+    ],
+
+    # Watch page controls
+    'like_button': [
+        Locator(CSS, 'like-button-view-model button'),
+        Locator(CSS, '#segmented-like-button button'),
+    ],
+    'dislike_button': [
+        Locator(CSS, 'dislike-button-view-model button'),
+        Locator(CSS, '#segmented-dislike-button button'),
+        Locator(CSS, 'button[aria-label="Dislike this video"]'),
+    ],
+    'subscribe_button': [
+        Locator(CSS, '#subscribe-button-shape button'),
+        Locator(CSS, '#subscribe-button button'),
+    ],
+    'notification_button': [
+        Locator(CSS, '#notification-preference-button button'),
+        Locator(XPATH, '//*[@id="notification-preference-button"]/ytd-subscription-notification-toggle-button-renderer-next/yt-button-shape/button'),
+    ],
+    'unsubscribe_menu_item': [
+        Locator(XPATH, '//ytd-menu-service-item-renderer[.//*[normalize-space(text())="Unsubscribe"]]'),
+        Locator(XPATH, '//*[@id="items"]/ytd-menu-service-item-renderer[4]/tp-yt-paper-item/yt-formatted-string'),
+    ],
+    'play_button': [Locator(CSS, '.ytp-play-button.ytp-button')],
+    'next_button': [
+        Locator(CSS, '.ytp-next-button'),
+        Locator(CSS, 'a[aria-label="Next keyboard shortcut SHIFT+n"]'),
+    ],
+    'description_expander': [
+        Locator(CSS, '#description-inline-expander #expand'),
+        Locator(CSS, '#bottom-row'),
+    ],
+    'description_collapse': [
+        Locator(CSS, '#description-inline-expander #collapse'),
+        Locator(CSS, '#collapse'),
+    ],
+    'comment_box': [Locator(CSS, '#placeholder-area')],
+    'comment_submit': [Locator(CSS, 'button[aria-label="Comment"]')],
+    'channel_link': [
+        Locator(CSS, 'ytd-video-owner-renderer #channel-name a'),
+        Locator(CSS, '#channel-name'),
+    ],
+    'premium_ad_dismiss': [Locator(CSS, 'button[aria-label="No thanks"]')],
+
+    # Other pages
+    'search_box': [
+        Locator(CSS, 'input[name="search_query"]'),
+        Locator(CSS, 'input#search'),
+    ],
+    'search_result_title': [
+        Locator(CSS, 'ytd-video-renderer a#video-title'),
+        Locator(CSS, '#video-title'),
+    ],
+    'home_video_link': [
+        Locator(CSS, '#media-container-link'),
+        Locator(CSS, 'ytd-rich-item-renderer a#thumbnail'),
+    ],
+}
+
+
+# Checks every candidate in one round trip and returns [index, element(s)] of the first that exists
+_FIND_SCRIPT = """
+const [candidates, all] = arguments;
+for (let i = 0; i < candidates.length; i++) {
+    const [kind, value] = candidates[i];
+    let found = [];
+    try {
+        if (kind === 'css') {
+            found = all ? Array.from(document.querySelectorAll(value)) : [document.querySelector(value)];
+        } else {
+            const snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < snapshot.snapshotLength; j++) found.push(snapshot.snapshotItem(j));
+            if (!all) found = found.slice(0, 1);
+        }
+    } catch (e) {
+        continue;
+    }
+    found = found.filter(Boolean);
+    if (found.length) return [i, all ? found : found[0]];
+}
+return null;
+"""
+
+
+def _add(totals: Dict[str, Dict[str, int]], counts: Dict[str, Dict[str, int]]) -> None:
+    for name, values in counts.items():
+        target = totals.setdefault(name, {})
+        for value, count in values.items():
+            target[value] = target.get(value, 0) + count
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on `path`, held against the other processes and threads until the block exits"""
+    with open(path, 'a+b') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue    # LK_LOCK gives up after 10 seconds
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SelectorRegistry:
+    """
+    Central place for every locator, with fallback candidates ordered by how often they matched.
+
+    Attributes:
+        path (str): JSON file where the learned hit counts are persisted, None to keep them in memory
+        autosave_every (int): Save after this many lookups
+    """
+
+    def __init__(self, path: Optional[str] = CONST.selector_stats_path, autosave_every: int = 200,
+                 locators: Optional[Dict[str, List[Locator]]] = None) -> None:
+        """
+        Args:
+            path: JSON file where the learned hit counts are persisted, None to keep them in memory
+            autosave_every: Save after this many lookups
+            locators: Replace the default locators, mostly useful for stand-in pages
+        """
+        self.path = path
+        self.autosave_every = autosave_every
+        self.locators = {name: list(candidates) for name, candidates in (locators or DEFAULT_LOCATORS).items()}
+        self.hits: Dict[str, Dict[str, int]] = {}
+        self._unsaved: Dict[str, Dict[str, int]] = {}     # hits since the last save, merged into the file then
+        self._lookups = 0
+        self._lock = threading.Lock()
+        self.load()
+
+
+    def candidates(self, name: str) -> List[Locator]:
+        """Candidates of `name`, most successful first (ties keep the default order)"""
+        hits = self.hits.get(name, {})
+        return sorted(self.locators[name], key=lambda locator: -hits.get(locator.value, 0))
+
+
+    def css(self, name: str) -> str:
+        """All CSS candidates of `name` as one selector list, for injected scripts"""
+        return ', '.join(locator.value for locator in self.candidates(name) if locator.kind == CSS)
+
+
+    def find(self, driver, name: str, timeout: float = 7) -> WebElement:
+        """
+        Wait until one of the candidates of `name` exists and return its element.
+        Raises TimeoutException when none of them shows up.
+        """
+        return self._find(driver, name, timeout, find_all=False)
+
+
+    def find_all(self, driver, name: str, timeout: float = 7) -> List[WebElement]:
+        """Like find, but return every element matched by the first candidate that exists"""
+        return self._find(driver, name, timeout, find_all=True)
+
+
+    def record_hit(self, name: str, locator: Locator) -> None:
+        with self._lock:
+            for table in (self.hits, self._unsaved):
+                counts = table.setdefault(name, {})
+                counts[locator.value] = counts.get(locator.value, 0) + 1
+            self._lookups += 1
+            should_save = self.autosave_every and self._lookups % self.autosave_every == 0
+
+        if should_save:
+            self.save()
+
+
+    def load(self) -> None:
+        """Read the learned hit counts, unknown names and stale candidates are ignored"""
+        stored = self._read_stored()
+        with self._lock:
+            self.hits = self._known(stored)
+            _add(self.hits, self._unsaved)
+
+
+    def save(self) -> None:
+        """
+        Add the hits counted since the last save to the file. Pooled and sharded checkers
+        share the file, so the counts on disk are merged rather than overwritten, under a
+        lock on `<path>.lock` so concurrent saves do not lose each other's counts.
+        """
+        if not self.path:
+            return
+
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        if not unsaved:
+            return
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Read, merge and replace as one step, a concurrent save would otherwise drop our counts
+            with _file_lock(self.path + '.lock'):
+                merged = self._read_stored()
+                _add(merged, unsaved)
+                temporary = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(temporary, 'w') as file:
+                    json.dump(merged, file, indent=2)
+                os.replace(temporary, self.path)
+        except OSError as e:
+            youtube_logger.error(f'Could not save selector stats {self.path}: {e}')
+            with self._lock:
+                _add(self._unsaved, unsaved)     # retried on the next save
+            return
+
+        # Learn from the other processes too
+        with self._lock:
+            self.hits = self._known(merged)
+            _add(self.hits, self._unsaved)
+
+
+    def _read_stored(self) -> Dict[str, Dict[str, int]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as file:
+                stored = json.load(file)
+        except (OSError, ValueError) as e:
+            youtube_logger.error(f'Could not read selector stats {self.path}: {e}')
+            return {}
+        return {name: {value: int(count) for value, count in counts.items()} for name, counts in stored.items()}
+
+
+    def _known(self, stored: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """The counts of names and candidates this registry knows"""
+        hits = {}
+        for name, counts in stored.items():
+            if name not in self.locators:
+                continue
+            known = {locator.value for locator in self.locators[name]}
+            hits[name] = {value: count for value, count in counts.items() if value in known}
+        return hits
+
+
+    def _find(self, driver, name: str, timeout: float, find_all: bool):
+        candidates = self.candidates(name)
+        payload = [[locator.kind, locator.value] for locator in candidates]
+
+        def located(driver) -> Tuple[int, object] | bool:
+            return driver.execute_script(_FIND_SCRIPT, payload, find_all) or False
+
+        index, found = WebDriverWait(driver, timeout).until(located, f'No locator of {name} matched')
+        self.record_hit(name, candidates[index])
+        return found
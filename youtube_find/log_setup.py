@@ -0,0 +1,191 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Iterator, Optional, Tuple
+
+
+_correlation_id: contextvars.ContextVar = contextvars.ContextVar('correlation_id', default=None)
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+@contextmanager
+def correlation_scope(prefix: Optional[str] = None) -> Iterator[str]:
+    """Tag every log record emitted inside the block (on this thread / task) with one correlation id"""
+    correlation_id = f'{prefix}-{uuid.uuid4().hex[:8]}' if prefix else uuid.uuid4().hex[:12]
+    token = _correlation_id.set(correlation_id)
+    try:
+        yield correlation_id
+    finally:
+        _correlation_id.reset(token)
+
+
+def current_correlation_id() -> Optional[str]:
+    return _correlation_id.get()
+
+
+class CorrelationFilter(logging.Filter):
+    """Copy the correlation id of the emitting context onto the record, before it leaves the thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most `burst` warnings/errors per call site and message through every `window` seconds.
+    The message is part of the key because shared helpers (decorators.error_handle) log every
+    field's failures from one line. The next record that gets through carries how many were suppressed.
+    """
+
+    max_sites = 4096
+
+    def __init__(self, burst: int = 5, window: float = 60) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        self._sites: Dict[Tuple[str, int, str], list] = {}     # call site, message -> [window start, emitted, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        key = (record.pathname, record.lineno, str(record.msg))
+        with self._lock:
+            if len(self._sites) >= self.max_sites:
+                self._prune(now)
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site else 0
+                self._sites[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        """Forget the sites whose window is over, messages carrying ids would grow the table forever"""
+        self._sites = {key: site for key, site in self._sites.items() if now - site[0] < self.window}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'message': record.getMessage(),
+        }
+        correlation_id = getattr(record, 'correlation_id', None)
+        if correlation_id:
+            entry['correlation_id'] = correlation_id
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """Keep the fields apart instead of flattening the record into one pre-formatted string"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks can not cross the queue, render them once here
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(path: str = 'logs/app.log', level: int = logging.INFO, max_bytes: int = 10 * 1024 * 1024,
+                      backup_count: int = 5, burst: int = 5, window: float = 60, per_process: Optional[bool] = None) -> None:
+    """
+    Send the logs through a queue to a background thread that writes rotating JSON lines,
+    so no file I/O or formatting of the output happens on the scraping threads.
+    Calling it again replaces the previous configuration.
+
+    Several processes must not rotate the same file (it races, and fails on Windows where
+    an open file can not be renamed), so a process can write its own '<name>.<pid>.log'.
+
+    Args:
+        path: Log file, rotated when it reaches `max_bytes`
+        level: Root logger level
+        max_bytes: Size of a log file before rotation
+        backup_count: Rotated files kept
+        burst: Repeated warnings/errors from one call site let through per window
+        window: Seconds of the rate limiting window
+        per_process: Write to '<name>.<pid>.log'. By default only child processes
+                     (ShardedRunner workers) do, the main process keeps `path`
+    """
+    global _listener, _queue_handler
+
+    shutdown_logging()
+
+    if per_process is None:
+        per_process = multiprocessing.parent_process() is not None
+    if per_process:
+        stem, extension = os.path.splitext(path)
+        path = f'{stem}.{os.getpid()}{extension}'
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler = _StructuredQueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter(burst, window))
+    _queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush the queue and stop the writer thread"""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict
+
+
+class Metrics:
+    """
+    Thread safe in-process counters and recent events.
+    
+    Attributes:
+        max_events (int): How many recent events are kept
+    """
+    
+    def __init__(self, max_events: int = 200) -> None:
+        """
+        Args:
+            max_events: How many recent events are kept
+        """
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._events = deque(maxlen=max_events)
+    
+    
+    def incr(self, name: str, value: int = 1) -> None:
+        """Increase the counter `name` by `value`"""
+        with self._lock:
+            self._counters[name] += value
+    
+    
+    def record_event(self, name: str, **fields: Any) -> None:
+        """Count the event and keep it with its fields in the recent events"""
+        with self._lock:
+            self._counters[name] += 1
+            self._events.append({'event': name, 'time': time.time(), **fields})
+    
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of all counters and recent events"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'events': list(self._events),
+            }
+
+
+# Shared by every YoutubeChecker of the process unless one is given explicitly
+metrics = Metrics()
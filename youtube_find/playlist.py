@@ -0,0 +1,198 @@
+import logging
+import re
+import time
+import random
+from typing import List, Optional, NamedTuple
+from urllib.parse import urlparse, parse_qs
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+import youtube_find.constant as CONST
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+_PLAYLIST_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class PlaylistEntry(NamedTuple):
+    """One video of a playlist, as read from the playlist panel or page"""
+    index: int
+    video_id: str
+    duration: Optional[int]     # seconds, None for live streams / unavailable videos
+    title: str
+
+
+# Reads every rendered playlist row in one round trip.
+# Works both on the watch page side panel and on the /playlist page.
+_READ_PLAYLIST_SCRIPT = """
+const panelRows = document.querySelectorAll('ytd-playlist-panel-renderer #items ytd-playlist-panel-video-renderer');
+const pageRows = document.querySelectorAll('ytd-playlist-video-list-renderer ytd-playlist-video-renderer');
+const rows = panelRows.length ? panelRows : pageRows;
+const out = [];
+for (const row of rows) {
+    const link = row.querySelector('a#wc-endpoint, a#video-title, a#thumbnail');
+    const index = row.querySelector('#index');
+    const time = row.querySelector('ytd-thumbnail-overlay-time-status-renderer #text, ytd-thumbnail-overlay-time-status-renderer badge-shape, .badge-shape-wiz__text');
+    const title = row.querySelector('#video-title');
+    out.push({
+        href: link ? link.getAttribute('href') : null,
+        index: index ? index.textContent.trim() : null,
+        time: time ? time.textContent.trim() : null,
+        title: title ? (title.getAttribute('title') || title.textContent).trim() : ''
+    });
+}
+return out;
+"""
+
+# Scrolls to the end of the list and tells whether a continuation (more rows to lazy load) is pending
+_SCROLL_PLAYLIST_SCRIPT = """
+const panel = document.querySelector('ytd-playlist-panel-renderer #items');
+if (panel && panel.children.length) {
+    panel.scrollTop = panel.scrollHeight;
+} else {
+    window.scrollTo(0, document.documentElement.scrollHeight);
+}
+return !!document.querySelector(
+    'ytd-playlist-panel-renderer ytd-continuation-item-renderer, ytd-playlist-video-list-renderer ytd-continuation-item-renderer'
+);
+"""
+
+
+class PlaylistExpander:
+    """
+    Read a whole playlist (or mix) in bulk instead of clicking through it
+    with `YTAction.to_next_video`.
+
+    Attributes:
+        driver (webdriver): Take in YoutubeChecker instance as a webdriver
+        max_scrolls (int): Upper bound of scrolls used to trigger lazy loading
+        patience (int): Scrolls in a row without new rows before giving up on a pending continuation
+        load_timeout (float): Seconds to wait for the first rows to be rendered
+    """
+
+    def __init__(self, driver, max_scrolls: int = 20, scroll_pause: tuple[float, float] = (0.6, 1.0),
+                 patience: int = 4, load_timeout: float = 10) -> None:
+        """
+        Args:
+            driver: Take in YoutubeChecker instance as a webdriver
+            max_scrolls: Upper bound of scrolls used to trigger lazy loading
+            scroll_pause: Tuple of (min, max) seconds to wait after each scroll
+            patience: Scrolls in a row without new rows before giving up on a pending continuation
+            load_timeout: Seconds to wait for the first rows to be rendered
+        """
+        self.driver = driver
+        self.max_scrolls = max_scrolls
+        self.scroll_pause = scroll_pause
+        self.patience = patience
+        self.load_timeout = load_timeout
+
+
+    def expand(self, url: str) -> List[PlaylistEntry]:
+        """
+        Open a playlist / mix url (watch page or playlist page) and return every entry.
+
+        Args:
+            url: Any url carrying a `list=` parameter (with or without scheme), or a bare playlist id
+
+        Returns:
+            List of PlaylistEntry ordered by playlist index, without duplicates
+        """
+        if not url:
+            return []
+
+        url = url.strip()
+        if _PLAYLIST_ID_RE.match(url):
+            url = CONST.youtube_playlist_url + url
+        elif '://' not in url:
+            url = 'https://' + url
+
+        self.driver.open(url)
+        return self.read_loaded()
+
+
+    def read_loaded(self) -> List[PlaylistEntry]:
+        """
+        Read the playlist of the page that is currently opened, scrolling a bounded
+        number of times until the list is fully loaded: no continuation is pending any more,
+        or `patience` scrolls in a row brought no new rows (continuations can be slow).
+        """
+        # The page may still be rendering (eager / none page load strategy, slow connection)
+        try:
+            entries = WebDriverWait(self.driver, self.load_timeout).until(lambda driver: self._read_rows())
+        except TimeoutException:
+            youtube_logger.warning('No playlist rows were rendered')
+            return []
+        stale_scrolls = 0
+
+        for _ in range(self.max_scrolls):
+            continuation_pending = self.driver.execute_script(_SCROLL_PLAYLIST_SCRIPT)
+            time.sleep(random.uniform(*self.scroll_pause))
+
+            more_entries = self._read_rows()
+            if len(more_entries) > len(entries):
+                entries = more_entries
+                stale_scrolls = 0
+                continue
+
+            stale_scrolls += 1
+            if not continuation_pending or stale_scrolls >= self.patience:
+                break
+
+        youtube_logger.info(f'Expanded playlist with {len(entries)} videos')
+        return entries
+
+
+    def video_urls(self, url: str) -> List[str]:
+        """Return the watch urls of the playlist, ready for batch retrieval"""
+        return [CONST.youtube_watch_url + entry.video_id for entry in self.expand(url)]
+
+
+    def _read_rows(self) -> List[PlaylistEntry]:
+        rows = self.driver.execute_script(_READ_PLAYLIST_SCRIPT) or []
+
+        entries = []
+        seen = set()
+        for position, row in enumerate(rows, start=1):
+            video_id = self._video_id_from_href(row.get('href'))
+            if not video_id or video_id in seen:
+                continue
+            seen.add(video_id)
+
+            index = row.get('index') or ''
+            entries.append(PlaylistEntry(
+                index=int(index) if index.isdigit() else position,
+                video_id=video_id,
+                duration=self._parse_timestamp(row.get('time')),
+                title=row.get('title') or '',
+            ))
+
+        entries.sort(key=lambda entry: entry.index)
+        return entries
+
+
+    @staticmethod
+    def _video_id_from_href(href: Optional[str]) -> Optional[str]:
+        if not href:
+            return None
+
+        video_id = parse_qs(urlparse(href).query).get('v')
+        if video_id:
+            return video_id[0]
+        return None
+
+
+    @staticmethod
+    def _parse_timestamp(text: Optional[str]) -> Optional[int]:
+        """Convert an overlay time like '1:02:03' into seconds"""
+        if not text:
+            return None
+
+        parts = text.strip().split(':')
+        if not all(part.isdigit() for part in parts):
+            return None
+
+        seconds = 0
+        for part in parts:
+            seconds = seconds * 60 + int(part)
+        return seconds
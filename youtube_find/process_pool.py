@@ -0,0 +1,309 @@
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import psutil
+except ImportError:     # without psutil only the driver service of a killed worker is stopped, not its browser
+    psutil = None
+
+import youtube_find.constant as CONST
+import youtube_find.canonical as canonical
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+def default_checker_factory(driver_path: str = CONST.webdriver_path):
+    """Build the per-process backend. Must stay a module level function so it can be pickled"""
+    from youtube_find.youtube_checker import YoutubeChecker
+    return YoutubeChecker(driver_path, auto_closing=True)
+
+
+def _next_task(index: int, task_queues: List[Any]) -> Optional[str]:
+    """Take from our own shard first, then steal from the other shards"""
+    try:
+        return task_queues[index].get(timeout=0.05)
+    except queue.Empty:
+        pass
+
+    for offset in range(1, len(task_queues)):
+        victim = task_queues[(index + offset) % len(task_queues)]
+        try:
+            return victim.get_nowait()
+        except queue.Empty:
+            continue
+    return None
+
+
+def _worker_main(index: int, task_queues: List[Any], results: Any, checker_factory: Callable[[], Any]) -> None:
+    """Entry point of a worker process, it owns its driver for its whole life"""
+    checker = None
+    reported_pid = None
+    try:
+        while True:
+            video_id = _next_task(index, task_queues)
+            if video_id is None:
+                break
+
+            results.put(('start', index, video_id, None))
+            try:
+                if checker is None:
+                    checker = checker_factory()
+                # The parent kills this driver if the worker hangs or dies, a recycle changes it
+                driver_pid = _driver_pid(checker)
+                if driver_pid != reported_pid:
+                    results.put(('driver', index, None, driver_pid))
+                    reported_pid = driver_pid
+                infos = checker.retrieve_infos(CONST.youtube_watch_url + video_id)
+                results.put(('done', index, video_id, infos))
+            except Exception as e:
+                results.put(('error', index, video_id, repr(e)))
+                # The browser may be gone, start a fresh one for the next task
+                _close_quietly(checker)
+                checker = None
+    finally:
+        _close_quietly(checker)
+        results.put(('exit', index, None, None))
+
+
+def _driver_pid(checker) -> Optional[int]:
+    """Pid of the driver service the checker started, parent of the browser processes"""
+    process = getattr(getattr(checker, 'service', None), 'process', None)
+    return getattr(process, 'pid', None)
+
+
+def _kill_tree(pids: Iterable[Optional[int]]) -> None:
+    """
+    Kill processes together with everything they started (driver service, browser).
+
+    Only for processes that are not our own children: waiting on a child here would reap
+    it behind multiprocessing's back, use `_stop_worker` for the workers.
+    """
+    pids = [pid for pid in pids if pid]
+    if psutil is None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        return
+
+    victims = {}
+    for pid in pids:
+        try:
+            root = psutil.Process(pid)
+            # Children first collected, once the parent is dead they are reparented
+            for victim in [root] + root.children(recursive=True):
+                victims[victim.pid] = victim
+        except psutil.Error:
+            continue
+    for victim in victims.values():
+        try:
+            victim.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(list(victims.values()), timeout=5)
+
+
+def _stop_worker(process, driver_pid: Optional[int]) -> None:
+    """Kill a worker process and join it, then kill its driver, browser and anything else it started"""
+    descendants = []
+    if psutil is not None:
+        try:
+            # Collected before the kill, the worker's children are reparented once it is gone
+            descendants = [child.pid for child in psutil.Process(process.pid).children(recursive=True)]
+        except psutil.Error:
+            pass
+
+    # multiprocessing reaps its own child, otherwise is_alive() would never turn False
+    process.kill()
+    process.join(timeout=5)
+    _kill_tree([driver_pid] + descendants)
+
+
+def _close_quietly(checker) -> None:
+    if checker is None:
+        return
+    try:
+        checker.close()
+    except Exception:
+        pass
+
+
+class ShardedRunner:
+    """
+    Scrape many videos on a pool of processes, each one owning its own driver.
+
+    Ids are sharded across per-worker queues; an idle worker steals from the other
+    shards. A worker whose process dies or hangs on one video is killed and restarted,
+    its in-flight id is queued again and the other shards keep their progress.
+
+    Attributes:
+        workers (int): Number of worker processes
+        task_timeout (float): Seconds a single video may take before the worker is considered hung
+        max_attempts (int): How many times an id is tried before giving up on it
+    """
+
+    def __init__(self, workers: Optional[int] = None, checker_factory: Callable[[], Any] = default_checker_factory,
+                 task_timeout: float = 180, max_attempts: int = 2) -> None:
+        """
+        Args:
+            workers: Number of worker processes, defaults to the number of cores
+            checker_factory: Picklable callable returning an object with `retrieve_infos(url)` and `close()`
+            task_timeout: Seconds a single video may take before the worker is considered hung
+            max_attempts: How many times an id is tried before giving up on it
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.checker_factory = checker_factory
+        self.task_timeout = task_timeout
+        self.max_attempts = max_attempts
+        self._context = mp.get_context('spawn')
+
+        if psutil is None:
+            youtube_logger.warning('psutil is not installed, browsers of hung workers may outlive them')
+
+
+    def run(self, video_ids: Iterable[str]) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """
+        Retrieve the infos of every video id.
+
+        Args:
+            video_ids: 11 characters video ids or any kind of video links, duplicates are fetched once
+
+        Returns:
+            Dict mapping every canonical id to its infos (None if every attempt failed)
+        """
+        video_ids = canonical.dedupe(video_ids)
+        if not video_ids:
+            return {}
+
+        worker_count = min(self.workers, len(video_ids))
+        # Manager queues live in their own server process, so killing a worker in the
+        # middle of a get/put cannot leave a lock held or a half written message behind
+        manager = self._context.Manager()
+        task_queues = [manager.Queue() for _ in range(worker_count)]
+        results_queue = manager.Queue()
+
+        for position, video_id in enumerate(video_ids):
+            task_queues[position % worker_count].put(video_id)
+
+        results: Dict[str, Optional[Dict[Any, Any]]] = {}
+        attempts: Dict[str, int] = {}
+        in_flight: Dict[int, tuple[str, float]] = {}
+        driver_pids: Dict[int, Optional[int]] = {}
+        processes = [self._spawn(index, task_queues, results_queue) for index in range(worker_count)]
+
+        def handle(message) -> None:
+            kind, index, video_id, payload = message
+            if kind == 'driver':
+                driver_pids[index] = payload
+            elif kind == 'start':
+                in_flight[index] = (video_id, time.monotonic())
+                attempts[video_id] = attempts.get(video_id, 0) + 1
+            elif kind == 'done':
+                in_flight.pop(index, None)
+                results[video_id] = payload
+            elif kind == 'error':
+                in_flight.pop(index, None)
+                youtube_logger.error(f'Worker {index} failed on {video_id}: {payload}')
+                if self._retry_or_give_up(video_id, index, attempts, results, task_queues):
+                    self._ensure_alive(index, processes, task_queues, results_queue)
+
+        try:
+            while len(results) < len(video_ids):
+                try:
+                    handle(results_queue.get(timeout=1))
+                except queue.Empty:
+                    pass
+
+                for index, process in enumerate(processes):
+                    hung = index in in_flight and time.monotonic() - in_flight[index][1] > self.task_timeout
+                    if process.is_alive() and not hung:
+                        continue
+
+                    if hung:
+                        youtube_logger.error(f'Worker {index} hung on {in_flight[index][0]}, restarting it')
+                        _stop_worker(process, driver_pids.pop(index, None))
+                    process.join(timeout=5)
+
+                    crashed = hung or process.exitcode != 0
+                    if crashed:
+                        # Its driver and browser were orphaned by the crash
+                        _kill_tree([driver_pids.pop(index, None)])
+                    # A clean exit only happens after the last result was sent
+                    lost = in_flight.pop(index, None) if crashed else None
+                    requeued = bool(lost) and self._retry_or_give_up(lost[0], index, attempts, results, task_queues)
+                    if crashed and len(results) < len(video_ids) or requeued:
+                        self._ensure_alive(index, processes, task_queues, results_queue)
+
+                if any(process.is_alive() for process in processes):
+                    continue
+
+                # Every worker is gone: flush what they sent, take back the ids that were
+                # never started (a worker may exit just before the last ones are queued again),
+                # whatever else is missing was lost with a crashed process before its 'start' got through
+                while True:
+                    try:
+                        handle(results_queue.get(timeout=0.2))
+                    except queue.Empty:
+                        break
+                never_started = set()
+                for task_queue in task_queues:
+                    while True:
+                        try:
+                            never_started.add(task_queue.get_nowait())
+                        except queue.Empty:
+                            break
+
+                for position, video_id in enumerate(video_ids):
+                    if video_id in results:
+                        continue
+                    index = position % worker_count
+                    if video_id in never_started:
+                        task_queues[index].put(video_id)
+                    else:
+                        attempts[video_id] = attempts.get(video_id, 0) + 1
+                        if not self._retry_or_give_up(video_id, index, attempts, results, task_queues):
+                            continue
+                    self._ensure_alive(index, processes, task_queues, results_queue)
+        finally:
+            for index, process in enumerate(processes):
+                if process.is_alive():
+                    _stop_worker(process, driver_pids.get(index))
+                process.join(timeout=5)
+            manager.shutdown()
+
+        return {video_id: results.get(video_id) for video_id in video_ids}
+
+
+    def _spawn(self, index: int, task_queues: List[Any], results_queue: Any):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, task_queues, results_queue, self.checker_factory),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+
+    def _ensure_alive(self, index: int, processes: List[Any], task_queues: List[Any], results_queue: Any) -> None:
+        if not processes[index].is_alive():
+            processes[index].join(timeout=5)
+            processes[index] = self._spawn(index, task_queues, results_queue)
+
+
+    def _retry_or_give_up(self, video_id: str, index: int, attempts: Dict[str, int],
+                          results: Dict[str, Optional[Dict[Any, Any]]], task_queues: List[Any]) -> bool:
+        """Queue the id again on its shard, return False if it is finished or out of attempts"""
+        if video_id in results:
+            return False
+        if attempts.get(video_id, 0) >= self.max_attempts:
+            results[video_id] = None
+            return False
+
+        task_queues[index].put(video_id)
+        return True
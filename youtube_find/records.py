@@ -0,0 +1,188 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Precompiled once, the normalizers run over millions of snapshots
+_COUNT_RE = re.compile(r"(\d[\d.,'\s]*)\s*([^\W\d_]+\.?)?")
+_SEPARATORS_RE = re.compile(r"['\s]")
+_ISO_DURATION_RE = re.compile(
+    r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$'
+)
+_CLOCK_DURATION_RE = re.compile(r'^(?:(\d+):)?(\d{1,2}):(\d{2})$')
+_GROUPED_RE = re.compile(r'^\d{1,3}(?:[.,]\d{3})+$')
+
+# Scale suffixes and words, lowercased without their trailing dot
+_MULTIPLIERS = {
+    'k': 1_000, 'thousand': 1_000, 'tsd': 1_000,
+    'm': 1_000_000, 'million': 1_000_000, 'millions': 1_000_000, 'mio': 1_000_000, 'mn': 1_000_000, 'mln': 1_000_000,
+    'b': 1_000_000_000, 'billion': 1_000_000_000, 'billions': 1_000_000_000, 'bn': 1_000_000_000,
+    'md': 1_000_000_000, 'mrd': 1_000_000_000, 'mld': 1_000_000_000,
+}
+
+
+def parse_count(text: Any) -> Optional[int]:
+    """
+    Turn a displayed count into an integer.
+    Handles '1,234', '1.234.567', '1 234', '12K', '1.2M', '1,2 M', '3B', '1.2 million', '1,2 Mio.' and
+    labels such as 'like this video along with 1,234 other people'.
+    Returns None for a fractional number without scale ('10.5'), which is not a count.
+    """
+    if text is None or isinstance(text, int):
+        return text
+
+    match = _COUNT_RE.search(text)
+    if not match:
+        return None
+
+    number = _SEPARATORS_RE.sub('', match.group(1)).rstrip('.,')
+    word = match.group(2)
+    multiplier = _MULTIPLIERS.get(word.rstrip('.').lower(), 1) if word else 1
+
+    # A scaled count is abbreviated, '1.234M' is 1.234 million, not 1234 million
+    if multiplier == 1 and _GROUPED_RE.match(number):
+        return int(number.replace('.', '').replace(',', ''))
+
+    # Not thousands grouping: the last separator is the decimal one, '1.2' or '1,2'
+    last = max(number.rfind('.'), number.rfind(','))
+    if last != -1:
+        number = number[:last].replace('.', '').replace(',', '') + '.' + number[last + 1:]
+    value = float(number) * multiplier
+    if multiplier == 1 and not value.is_integer():
+        return None
+    return int(round(value))
+
+
+def parse_duration(text: Any) -> Optional[int]:
+    """Turn an ISO-8601 duration ('PT1H2M3S', 'P1DT2H') or a clock time ('1:02:03') into seconds"""
+    if text is None or isinstance(text, int):
+        return text
+
+    text = text.strip()
+    match = _ISO_DURATION_RE.match(text)
+    if match and text not in ('P', 'PT'):
+        days, hours, minutes, seconds = match.group('days', 'hours', 'minutes', 'seconds')
+        return (int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60
+                + int(float(seconds or 0)))
+
+    match = _CLOCK_DURATION_RE.match(text)
+    if match:
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+    return None
+
+
+def format_duration(seconds: Optional[int]) -> Optional[str]:
+    """Format seconds as 'HH:MM:SS'"""
+    if seconds is None:
+        return None
+    return f'{seconds // 3600:02}:{(seconds % 3600) // 60:02}:{seconds % 60:02}'
+
+
+def parse_date(text: Any) -> Optional[datetime]:
+    """Parse the ISO dates of the meta tags ('2024-03-05' or '2024-03-05T08:00:07-08:00')"""
+    if text is None or isinstance(text, datetime):
+        return text
+    try:
+        return datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+
+
+def parse_bool(text: Any) -> Optional[bool]:
+    if text is None or isinstance(text, bool):
+        return text
+    return text.strip().lower() == 'true'
+
+
+def parse_list(text: Any) -> List[str]:
+    if not text:
+        return []
+    if isinstance(text, list):
+        return text
+    return [item.strip() for item in text.split(',') if item.strip()]
+
+
+def mostly_retrieved(infos: Optional[Dict[str, Any]]) -> bool:
+    """False for empty infos or infos where most lookups came back empty (timed out, page not rendered)"""
+    if not infos:
+        return False
+    missing = sum(value is None for value in infos.values())
+    return missing <= len(infos) // 2
+
+
+class VideoRecord:
+    """
+    Typed, compact result of one retrieval: numbers are integers, the duration is in
+    seconds and dates are datetimes, ready for aggregation.
+    """
+
+    __slots__ = (
+        'video_id', 'url', 'title', 'channel_name', 'description', 'thumbnail', 'genre',
+        'duration', 'view_count', 'like_count', 'comment_count', 'sub_count',
+        'upload_date', 'date_published', 'family_friendly',
+        'keywords', 'regions_allowed', 'banned_regions',
+    )
+
+    def __init__(self, **fields: Any) -> None:
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f'Unknown VideoRecord fields: {", ".join(fields)}')
+
+
+    @classmethod
+    def from_infos(cls, infos: Dict[str, Any]) -> 'VideoRecord':
+        """Build a record from the dict returned by `YoutubeChecker.retrieve_infos`"""
+        url = infos.get('Video URL')
+        return cls(
+            video_id=_video_id(url),
+            url=url,
+            title=infos.get('Title'),
+            channel_name=infos.get('ChannelName'),
+            description=infos.get('Description'),
+            thumbnail=infos.get('Thumbnail'),
+            genre=infos.get('Video Genre'),
+            duration=parse_duration(infos.get('Video Length')),
+            view_count=parse_count(infos.get('View Count')),
+            like_count=parse_count(infos.get('Like Count')),
+            comment_count=parse_count(infos.get('Comment Count')),
+            sub_count=parse_count(infos.get('Sub Count')),
+            upload_date=parse_date(infos.get('Upload Date')),
+            date_published=parse_date(infos.get('Date Published')),
+            family_friendly=parse_bool(infos.get('Family Friendly')),
+            keywords=parse_list(infos.get('KeyWords')),
+            regions_allowed=parse_list(infos.get('Allowed Regions')),
+            banned_regions=parse_list(infos.get('Banned Regions')),
+        )
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VideoRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+
+    def __repr__(self) -> str:
+        return f'VideoRecord(video_id={self.video_id!r}, title={self.title!r})'
+
+
+def normalize_many(snapshots: Iterable[Dict[str, Any]]) -> List[VideoRecord]:
+    """Normalize many raw `retrieve_infos` snapshots at once, skipping failed (None) ones"""
+    from_infos = VideoRecord.from_infos
+    return [from_infos(infos) for infos in snapshots if infos]
+
+
+_VIDEO_ID_RE = re.compile(r'[?&]v=([A-Za-z0-9_-]{11})')
+
+
+def _video_id(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
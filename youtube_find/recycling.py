@@ -0,0 +1,133 @@
+import logging
+from typing import Optional
+
+from youtube_find.metrics import Metrics, metrics as default_metrics
+
+try:
+    import psutil
+except ImportError:     # RSS trigger is disabled without psutil
+    psutil = None
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+class RecyclePolicy:
+    """
+    When a long running browser should be replaced by a fresh one.
+    Every trigger left to None is disabled.
+    
+    Attributes:
+        max_pages (int): Recycle after this many page loads
+        max_rss_mb (float): Recycle when the browser process tree uses more memory than this
+        max_consecutive_timeouts (int): Recycle after this many timeouts in a row
+    """
+    
+    def __init__(self, max_pages: Optional[int] = None, max_rss_mb: Optional[float] = None,
+                 max_consecutive_timeouts: Optional[int] = None) -> None:
+        """
+        Args:
+            max_pages: Recycle after this many page loads
+            max_rss_mb: Recycle when the browser process tree uses more memory than this (needs psutil)
+            max_consecutive_timeouts: Recycle after this many timeouts in a row
+        """
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.max_consecutive_timeouts = max_consecutive_timeouts
+        
+        if max_rss_mb is not None and psutil is None:
+            youtube_logger.warning('psutil is not installed, the RSS recycling trigger is disabled')
+
+
+class DriverRecycler:
+    """
+    Keep the counters of a YoutubeChecker and replace its browser when the policy says so.
+    
+    Attributes:
+        driver (webdriver): Take in YoutubeChecker instance as a webdriver
+        policy (RecyclePolicy): The triggers to check
+        metrics (Metrics): Where recycle events are recorded
+    """
+    
+    def __init__(self, driver, policy: Optional[RecyclePolicy] = None, metrics: Optional[Metrics] = None) -> None:
+        """
+        Args:
+            driver: Take in YoutubeChecker instance as a webdriver, it must provide `restart()`
+            policy: The triggers to check, nothing is recycled by default
+            metrics: Where recycle events are recorded, the shared process metrics by default
+        """
+        self.driver = driver
+        self.policy = policy or RecyclePolicy()
+        self.metrics = metrics or default_metrics
+        self.pages = 0
+        self.consecutive_timeouts = 0
+    
+    
+    def note_page(self) -> None:
+        self.pages += 1
+    
+    
+    def note_timeout(self) -> None:
+        self.consecutive_timeouts += 1
+        self.metrics.incr('timeouts')
+    
+    
+    def note_success(self) -> None:
+        self.consecutive_timeouts = 0
+    
+    
+    def reason(self) -> Optional[str]:
+        """Return which trigger fired, None if the browser can be kept"""
+        policy = self.policy
+        if policy.max_pages is not None and self.pages >= policy.max_pages:
+            return 'pages'
+        if policy.max_consecutive_timeouts is not None and self.consecutive_timeouts >= policy.max_consecutive_timeouts:
+            return 'timeouts'
+        if policy.max_rss_mb is not None:
+            rss_mb = self.browser_rss_mb()
+            if rss_mb is not None and rss_mb > policy.max_rss_mb:
+                return 'rss'
+        return None
+    
+    
+    def maybe_recycle(self) -> bool:
+        """
+        Replace the browser if a trigger fired. Meant to be called between retrievals.
+        
+        Returns:
+            bool: True if the browser was replaced
+        """
+        reason = self.reason()
+        if not reason:
+            return False
+        
+        youtube_logger.info(f'Recycling browser ({reason}) after {self.pages} pages')
+        self.metrics.record_event('driver_recycled', reason=reason, pages=self.pages,
+                                  consecutive_timeouts=self.consecutive_timeouts)
+        self.driver.restart()
+        self.pages = 0
+        self.consecutive_timeouts = 0
+        return True
+    
+    
+    def browser_rss_mb(self) -> Optional[float]:
+        """Resident memory of the driver service and every browser process it started, in MB"""
+        if psutil is None:
+            return None
+        
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        if process is None:
+            return None
+        
+        try:
+            root = psutil.Process(process.pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        
+        total = 0
+        for member in tree:
+            try:
+                total += member.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
@@ -0,0 +1,217 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from youtube_find.metrics import Metrics, metrics as default_metrics
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+# Failure classes
+TRANSIENT = 'transient'      # network hiccup, page still loading: worth retrying
+MISSING = 'missing'          # element absent on this video only: give up on it
+STRUCTURAL = 'structural'    # page rendered but the locator matched nothing: layout probably changed
+
+_NETWORK_MARKERS = ('net::err_', 'disconnected', 'connection refused', 'timed out', 'timeout')
+
+
+def classify_error(error: BaseException, page_ready: Optional[bool] = None) -> str:
+    """
+    Decide what kind of failure an extraction error is.
+
+    Args:
+        error: The exception raised while locating an element
+        page_ready: Whether the watch page itself was rendered when the error happened
+
+    Returns:
+        One of TRANSIENT, MISSING or STRUCTURAL
+    """
+    if isinstance(error, StaleElementReferenceException):
+        return TRANSIENT
+    if isinstance(error, NoSuchElementException):
+        return MISSING
+    if isinstance(error, TimeoutException):
+        return STRUCTURAL if page_ready else TRANSIENT
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        if any(marker in message for marker in _NETWORK_MARKERS):
+            return TRANSIENT
+    return MISSING
+
+
+class CircuitBreaker:
+    """
+    Skip a selector after repeated structural misses, then let a single probe
+    through once the cooldown is over (half-open).
+
+    Attributes:
+        threshold (int): Consecutive structural misses that open the breaker
+        cooldown (float): Seconds to stay open before a half-open probe
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold: int = 5, cooldown: float = 300) -> None:
+        """
+        Args:
+            threshold: Consecutive structural misses that open the breaker
+            cooldown: Seconds to stay open before a half-open probe
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+
+    def allow(self) -> bool:
+        """Return True if the guarded call may run now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN      # this caller is the probe
+                return True
+            return False
+
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+
+    def record_failure(self) -> bool:
+        """
+        Count a structural miss.
+
+        Returns:
+            bool: True if this failure (re)opened the breaker
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+    def release(self) -> None:
+        """A probe that ended without verdict (transient / missing) lets the next caller probe"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.cooldown
+
+
+class Resilience:
+    """
+    Retry transient failures with backoff and keep one circuit breaker per selector.
+
+    Attributes:
+        retries (int): Extra attempts for transient failures
+        backoff (float): Base delay in seconds, doubled on each retry
+        probe_timeout (float): Wait of the retries that follow a timeout, the full wait was already spent
+        breaker_threshold (int): Consecutive structural misses that open a selector breaker
+        breaker_cooldown (float): Seconds before a half-open probe of an open selector
+    """
+
+    def __init__(self, retries: int = 2, backoff: float = 0.5, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 300, metrics: Optional[Metrics] = None, probe_timeout: float = 1.0) -> None:
+        """
+        Args:
+            retries: Extra attempts for transient failures
+            backoff: Base delay in seconds, doubled on each retry
+            breaker_threshold: Consecutive structural misses that open a selector breaker
+            breaker_cooldown: Seconds before a half-open probe of an open selector
+            metrics: Where breaker and retry events are recorded, the shared process metrics by default
+            probe_timeout: Wait of the retries that follow a timeout
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.probe_timeout = probe_timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.metrics = metrics or default_metrics
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+        return self.breakers[key]
+
+
+    def allow(self, key: str) -> bool:
+        """Return False if the selector `key` is currently skipped"""
+        if self.breaker(key).allow():
+            return True
+        self.metrics.incr('breaker_skips')
+        return False
+
+
+    def call(self, key: str, func: Callable[[float], Any], page_ready: Callable[[], bool], wait: float) -> Any:
+        """
+        Run `func`, retrying transient failures, and feed the breaker of `key`.
+        The caller is expected to have checked `allow(key)` first.
+
+        A lookup that timed out already waited `wait` seconds, so its retries are short
+        probes without backoff: one missing field costs about `wait` plus the probes,
+        not `wait` once per attempt.
+
+        Args:
+            key: Name of the selector guarded by the breaker
+            func: The lookup to run, called with the seconds it may wait
+            page_ready: Tells whether the page was rendered, used to classify timeouts
+            wait: Seconds the first attempt may wait
+
+        Returns:
+            Whatever `func` returns. The last error is re-raised when giving up.
+        """
+        breaker = self.breaker(key)
+        attempt = 0
+        while True:
+            try:
+                result = func(wait)
+            except Exception as e:
+                kind = classify_error(e, self._safe_ready(page_ready))
+                if kind == TRANSIENT and attempt < self.retries:
+                    if isinstance(e, TimeoutException):
+                        wait = min(wait, self.probe_timeout)
+                    else:
+                        time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2))
+                    attempt += 1
+                    self.metrics.incr('transient_retries')
+                    continue
+
+                if kind == STRUCTURAL:
+                    if breaker.record_failure():
+                        youtube_logger.warning(f'Circuit opened for selector {key}')
+                        self.metrics.record_event('breaker_opened', selector=key)
+                else:
+                    breaker.release()
+                raise
+
+            breaker.record_success()
+            return result
+
+
+    @staticmethod
+    def _safe_ready(page_ready: Callable[[], bool]) -> bool:
+        try:
+            return bool(page_ready())
+        except Exception:
+            return False
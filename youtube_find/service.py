@@ -0,0 +1,303 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import youtube_find.constant as CONST
+import youtube_find.records as records
+from youtube_find.cache import TTLCache
+from youtube_find.canonical import SingleFlight, canonical_video_id, dedupe
+from youtube_find.metrics import Metrics, metrics as default_metrics
+from youtube_find.process_pool import default_checker_factory
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+class DriverPool:
+    """
+    A bounded pool of warm YoutubeChecker instances, started lazily.
+
+    Attributes:
+        size (int): Maximum number of browsers
+    """
+
+    def __init__(self, checker_factory: Callable[[], Any] = default_checker_factory, size: int = 2) -> None:
+        """
+        Args:
+            checker_factory: Callable returning an object with `retrieve_infos(url)` and `close()`
+            size: Maximum number of browsers
+        """
+        self.checker_factory = checker_factory
+        self.size = size
+        self._idle: queue.Queue = queue.Queue()
+        self._created = 0
+        self._all: List[Any] = []
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Borrow a checker, blocking while all of them are busy.
+        A checker whose use raised is discarded, its browser may be gone, and a new one is built in its place.
+        """
+        checker = self._take()
+        succeeded = False
+        try:
+            yield checker
+            succeeded = True
+        finally:
+            if succeeded:
+                self._idle.put(checker)
+            else:
+                self._discard(checker)
+
+
+    def close(self) -> None:
+        with self._lock:
+            checkers, self._all = self._all, []
+        for checker in checkers:
+            try:
+                checker.close()
+            except Exception as e:
+                youtube_logger.exception(f'Error closing pooled browser: {e}')
+
+
+    def _take(self) -> Any:
+        while True:
+            try:
+                checker = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                checker = self._create() if can_create else self._idle.get()
+
+            # None only wakes up a waiter after a checker was discarded, so it can build the replacement
+            if checker is not None:
+                return checker
+
+
+    def _create(self) -> Any:
+        try:
+            checker = self.checker_factory()
+        except Exception:
+            self._free_slot()
+            raise
+        with self._lock:
+            self._all.append(checker)
+        return checker
+
+
+    def _discard(self, checker: Any) -> None:
+        with self._lock:
+            if checker in self._all:
+                self._all.remove(checker)
+        try:
+            checker.close()
+        except Exception as e:
+            youtube_logger.error(f'Error closing discarded browser: {e}')
+        self._free_slot()
+
+
+    def _free_slot(self) -> None:
+        with self._lock:
+            self._created -= 1
+        self._idle.put(None)
+
+
+class VideoService:
+    """
+    Cached, pooled retrieval shared by every client of the local HTTP service.
+
+    Attributes:
+        pool (DriverPool): The warm browsers
+        cache (TTLCache): Retrieved infos by video id
+        watch_url (str): Prefix the video id is appended to, point it to stand-in pages for tests
+    """
+
+    def __init__(self, checker_factory: Callable[[], Any] = default_checker_factory, pool_size: int = 2,
+                 cache_ttl: float = 3600, cache_size: int = 10_000, watch_url: str = CONST.youtube_watch_url,
+                 metrics: Optional[Metrics] = None) -> None:
+        """
+        Args:
+            checker_factory: Callable returning an object with `retrieve_infos(url)` and `close()`
+            pool_size: Maximum number of browsers
+            cache_ttl: Seconds a retrieved video stays cached
+            cache_size: Maximum number of cached videos
+            watch_url: Prefix the video id is appended to
+            metrics: Where request counters are recorded, the shared process metrics by default
+        """
+        self.pool = DriverPool(checker_factory, pool_size)
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.watch_url = watch_url
+        self.metrics = metrics or default_metrics
+        self._inflight = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+
+    def get_video(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return the infos of one video, from the cache when possible"""
+        infos = self.cache.get(video_id)
+        if infos is not None:
+            self.metrics.incr('cache_hits')
+            return infos
+
+        self.metrics.incr('cache_misses')
+        return self._inflight.do(video_id, lambda: self._fetch(video_id))
+
+
+    def get_videos(self, video_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return the infos of many videos, fetching the missing ones in parallel on the pool"""
+        futures = {video_id: self._executor.submit(self._get_video_safely, video_id) for video_id in video_ids}
+        return {video_id: future.result() for video_id, future in futures.items()}
+
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.metrics.snapshot()
+        snapshot['cache_size'] = len(self.cache)
+        snapshot['pool_size'] = self.pool.size
+        snapshot['in_flight'] = self._inflight.in_flight()
+        return snapshot
+
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+
+
+    def _fetch(self, video_id: str) -> Optional[Dict[str, Any]]:
+        started = time.monotonic()
+        with self.pool.acquire() as checker:
+            infos = checker.retrieve_infos(self.watch_url + video_id)
+
+        self.metrics.incr('fetches')
+        self.metrics.incr('fetch_milliseconds', int((time.monotonic() - started) * 1000))
+        if _cacheable(infos):
+            self.cache.set(video_id, infos)
+        return infos
+
+
+    def _get_video_safely(self, video_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.get_video(video_id)
+        except Exception as e:
+            self.metrics.incr('fetch_errors')
+            youtube_logger.exception(f'Could not retrieve {video_id}: {e}')
+            return None
+
+
+def _cacheable(infos: Optional[Dict[str, Any]]) -> bool:
+    """A retrieval where most lookups timed out is served once, not for the whole TTL"""
+    return records.mostly_retrieved(infos)
+
+
+def select_fields(infos: Optional[Dict[str, Any]], fields: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    """
+    Keep only the requested fields. Names are matched loosely:
+    'video_length', 'videolength' and 'Video Length' are the same field.
+    """
+    if infos is None or not fields:
+        return infos
+
+    wanted = {_field_key(field) for field in fields}
+    return {key: value for key, value in infos.items() if _field_key(key) in wanted}
+
+
+def _field_key(name: str) -> str:
+    return ''.join(character for character in name.lower() if character.isalnum())
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    service: VideoService = None
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        fields = [field for value in params.get('fields', []) for field in value.split(',') if field]
+        self.service.metrics.incr('http_requests')
+
+        try:
+            if parsed.path == '/metrics':
+                self._send(200, self.service.stats())
+
+            elif parsed.path.startswith('/video/'):
+                video_id = canonical_video_id(parsed.path[len('/video/'):])
+                if not video_id:
+                    self._send(400, {'error': 'invalid video id'})
+                    return
+                infos = self.service.get_video(video_id)
+                if infos is None:
+                    self._send(404, {'error': 'video not retrieved', 'id': video_id})
+                else:
+                    self._send(200, {'id': video_id, 'infos': select_fields(infos, fields)})
+
+            elif parsed.path == '/videos':
+                ids = [video_id for value in params.get('ids', []) for video_id in value.split(',')]
+                video_ids = dedupe(ids)
+                if not video_ids:
+                    self._send(400, {'error': 'no valid video id in ids='})
+                    return
+                results = self.service.get_videos(video_ids)
+                self._send(200, {video_id: select_fields(infos, fields) for video_id, infos in results.items()})
+
+            else:
+                self._send(404, {'error': 'unknown endpoint'})
+
+        except Exception as e:
+            self.service.metrics.incr('http_errors')
+            youtube_logger.exception(f'Error serving {self.path}: {e}')
+            self._send(500, {'error': str(e)})
+
+
+    def log_message(self, format: str, *args: Any) -> None:
+        youtube_logger.info(f'{self.address_string()} - {format % args}')
+
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service: VideoService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """Build (but do not start) the HTTP server, port 0 picks a free port"""
+    handler = type('ServiceHandler', (_ServiceHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local HTTP service exposing cached, pooled YouTube retrieval')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pool-size', type=int, default=2)
+    parser.add_argument('--cache-ttl', type=float, default=3600)
+    args = parser.parse_args()
+
+    service = VideoService(pool_size=args.pool_size, cache_ttl=args.cache_ttl)
+    server = make_server(service, args.host, args.port)
+    youtube_logger.info(f'Serving on http://{args.host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import youtube_find.constant as CONST
+import youtube_find.canonical as canonical
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+# Starts the navigation and returns at once, unlike driver.get()
+_NAVIGATE_SCRIPT = 'window.location.href = arguments[0];'
+
+
+class _Tab:
+    __slots__ = ('handle', 'url', 'uses')
+
+    def __init__(self, handle: str) -> None:
+        self.handle = handle
+        self.url: Optional[str] = None
+        self.uses = 0
+
+
+class TabPipeline:
+    """
+    Keep K tabs of one browser busy: while the current tab is being extracted, the
+    next urls are already loading in the background tabs.
+
+    Attributes:
+        checker (YoutubeChecker): The browser the tabs belong to
+        tabs (int): Number of tabs, the current one included
+        recycle_after (int): Pages a tab loads before it is closed and replaced, to cap its memory
+    """
+
+    def __init__(self, checker, tabs: int = 3, recycle_after: int = 25) -> None:
+        """
+        Args:
+            checker: YoutubeChecker instance, preferably with page_load_strategy='none' so that
+                     starting a navigation in a background tab never blocks on its load
+            tabs: Number of tabs, the current one included
+            recycle_after: Pages a tab loads before it is closed and replaced
+        """
+        self.checker = checker
+        self.tabs = max(1, tabs)
+        self.recycle_after = recycle_after
+
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[Dict[Any, Any]]]]:
+        """
+        Retrieve the infos of every video, prefetching the next ones in background tabs.
+        The checker must not be used for anything else while iterating.
+
+        Yields:
+            (video_id, infos) in input order, infos is None if extraction failed
+        """
+        pending: Deque[str] = deque(canonical.dedupe(urls))
+        if not pending:
+            return
+
+        loading: Deque[_Tab] = deque()
+        idle: List[_Tab] = self._open_tabs(min(self.tabs, len(pending)))
+
+        try:
+            while pending or loading:
+                while idle and pending:
+                    tab = idle.pop()
+                    self._start_loading(tab, pending.popleft())
+                    loading.append(tab)
+
+                tab = loading.popleft()
+                video_id = canonical.canonical_video_id(tab.url)
+                yield video_id, self._extract(tab, video_id)
+
+                if tab.uses >= self.recycle_after and pending:
+                    tab = self._replace(tab)
+                idle.append(tab)
+        finally:
+            self._close_extra_tabs(idle + list(loading))
+
+
+    def _open_tabs(self, count: int) -> List[_Tab]:
+        checker = self.checker
+        tabs = [_Tab(checker.current_window_handle)]
+        for _ in range(count - 1):
+            checker.switch_to.new_window('tab')
+            tabs.append(_Tab(checker.current_window_handle))
+        return tabs
+
+
+    def _start_loading(self, tab: _Tab, video_id: str) -> None:
+        tab.url = CONST.youtube_watch_url + video_id
+        tab.uses += 1
+        self.checker.switch_to.window(tab.handle)
+        self.checker.execute_script(_NAVIGATE_SCRIPT, tab.url)
+        self.checker.recycler.note_page()
+
+
+    def _extract(self, tab: _Tab, video_id: str) -> Optional[Dict[Any, Any]]:
+        checker = self.checker
+        try:
+            with checker._driver_lock:
+                checker.switch_to.window(tab.handle)
+                checker.wait_until_ready(video_id)
+                checker.actions.dismiss_premium_ad_if_present()
+                return checker.extract_infos(tab.url)
+        except Exception as e:
+            youtube_logger.exception(f'Could not extract {video_id} in tab: {e}')
+            return None
+
+
+    def _replace(self, tab: _Tab) -> _Tab:
+        """Close a worn out tab and open a fresh one in its place"""
+        checker = self.checker
+        checker.switch_to.window(tab.handle)
+        checker.switch_to.new_window('tab')
+        fresh = _Tab(checker.current_window_handle)
+        checker.switch_to.window(tab.handle)
+        checker.close_tab()
+        checker.switch_to.window(fresh.handle)
+        return fresh
+
+
+    def _close_extra_tabs(self, tabs: List[_Tab]) -> None:
+        """Leave the browser with a single tab, as it was before run()"""
+        checker = self.checker
+        try:
+            handles = checker.window_handles
+            for tab in tabs[1:]:
+                if tab.handle in handles and len(checker.window_handles) > 1:
+                    checker.switch_to.window(tab.handle)
+                    checker.close_tab()
+            checker.switch_to.window(checker.window_handles[0])
+        except Exception as e:
+            youtube_logger.error(f'Could not close the prefetch tabs: {e}')
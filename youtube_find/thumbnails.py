@@ -0,0 +1,176 @@
+import io
+import logging
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from PIL import Image
+except ImportError:     # without Pillow thumbnails are written as downloaded
+    Image = None
+
+youtube_logger = logging.getLogger('youtube_find.youtube_checker')
+
+
+# Thumbnail variants served for every video, smallest first: (name, width, height)
+VARIANTS: List[Tuple[str, int, int]] = [
+    ('default', 120, 90),
+    ('mqdefault', 320, 180),
+    ('hqdefault', 480, 360),
+    ('sddefault', 640, 480),
+    ('maxresdefault', 1280, 720),
+]
+
+_THUMBNAIL_ID_RE = re.compile(r'/vi(?:_webp)?/([A-Za-z0-9_-]{11})/')
+
+
+def choose_variant(width: int, height: int) -> str:
+    """Smallest variant at least as large as the target, maxres if none is"""
+    for name, variant_width, variant_height in VARIANTS:
+        if variant_width >= width and variant_height >= height:
+            return name
+    return VARIANTS[-1][0]
+
+
+def video_id_from_thumbnail(url: Optional[str]) -> Optional[str]:
+    """Video id of an og:image url such as https://i.ytimg.com/vi/<id>/maxresdefault.jpg"""
+    if not url:
+        return None
+    match = _THUMBNAIL_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def _resize_to_file(data: bytes, path: str, size: Tuple[int, int], quality: int) -> str:
+    """Decode, shrink and re-encode one image. Module level so it can run on a process pool"""
+    if Image is None:
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGB')
+        image.thumbnail(size)
+        image.save(path, 'JPEG', quality=quality, optimize=True)
+    return path
+
+
+class ThumbnailPipeline:
+    """
+    Download thumbnails over one pooled session with bounded concurrency, picking the
+    smallest variant that covers the size they are displayed at.
+
+    Attributes:
+        base_url (str): Where '<id>/<variant>.jpg' is fetched from, point it to a local server for tests
+        max_workers (int): Concurrent downloads
+        output_dir (str): Where process_many writes its files
+    """
+
+    def __init__(self, base_url: str = 'https://i.ytimg.com/vi', max_workers: int = 8, timeout: float = 10,
+                 output_dir: str = 'thumbnails', quality: int = 80, resize_workers: int = 0) -> None:
+        """
+        Args:
+            base_url: Where '<id>/<variant>.jpg' is fetched from
+            max_workers: Concurrent downloads, also the size of the connection pool
+            timeout: Seconds before a download is abandoned
+            output_dir: Where process_many writes its files
+            quality: JPEG quality of the resized files
+            resize_workers: Processes used to decode / resize, 0 resizes on the download threads
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.output_dir = output_dir
+        self.quality = quality
+        self.resize_workers = resize_workers
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max_workers,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+
+    def url(self, video_id: str, variant: str) -> str:
+        return f'{self.base_url}/{video_id}/{variant}.jpg'
+
+
+    def fetch(self, video_id: str, size: Tuple[int, int] = (250, 80)) -> Optional[bytes]:
+        """
+        Download the thumbnail variant fitting `size`, falling back to smaller ones
+        when it does not exist (maxres / sd are missing for many videos).
+
+        Returns:
+            The image bytes, None if no variant could be downloaded
+        """
+        names = [name for name, _, _ in VARIANTS]
+        start = names.index(choose_variant(*size))
+        # Preferred variant, then smaller ones (hqdefault always exists), then larger as a last resort
+        order = names[start::-1] + names[start + 1:]
+
+        for variant in order:
+            try:
+                response = self.session.get(self.url(video_id, variant), timeout=self.timeout)
+            except requests.RequestException as e:
+                youtube_logger.error(f'Could not download thumbnail {variant} of {video_id}: {e}')
+                return None
+            if response.status_code == 404:
+                continue
+            if response.ok:
+                return response.content
+            youtube_logger.error(f'Thumbnail {variant} of {video_id} answered {response.status_code}')
+            return None
+        return None
+
+
+    def submit(self, video_id: str, size: Tuple[int, int] = (250, 80)) -> Future:
+        """Schedule one download on the pool, the future resolves to the image bytes or None"""
+        return self._executor.submit(self.fetch, video_id, size)
+
+
+    def fetch_many(self, video_ids: Iterable[str], size: Tuple[int, int] = (250, 80)) -> Dict[str, Optional[bytes]]:
+        """Download many thumbnails concurrently"""
+        futures = {video_id: self._executor.submit(self.fetch, video_id, size) for video_id in dict.fromkeys(video_ids)}
+        return {video_id: future.result() for video_id, future in futures.items()}
+
+
+    def process_many(self, video_ids: Iterable[str], size: Tuple[int, int] = (250, 80)) -> Dict[str, Optional[str]]:
+        """
+        Download, shrink to `size` (with Pillow) and write compact JPEG files to output_dir.
+
+        Returns:
+            Dict mapping every id to its file path, None if it could not be downloaded
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        downloads = self.fetch_many(video_ids, size)
+        paths: Dict[str, Optional[str]] = {video_id: None for video_id in downloads}
+
+        jobs = {
+            video_id: (data, os.path.join(self.output_dir, f'{video_id}_{size[0]}x{size[1]}.jpg'), size, self.quality)
+            for video_id, data in downloads.items() if data
+        }
+        if self.resize_workers > 0:
+            with ProcessPoolExecutor(max_workers=self.resize_workers) as pool:
+                futures = {video_id: pool.submit(_resize_to_file, *job) for video_id, job in jobs.items()}
+        else:
+            futures = {video_id: self._executor.submit(_resize_to_file, *job) for video_id, job in jobs.items()}
+
+        for video_id, future in futures.items():
+            try:
+                paths[video_id] = future.result()
+            except Exception as e:
+                youtube_logger.error(f'Could not write thumbnail of {video_id}: {e}')
+        return paths
+
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
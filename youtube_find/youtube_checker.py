@@ -1,27 +1,34 @@
 import logging
-import string
+import threading
 import time
 import random
 from typing import List, Optional, Dict, Any
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
 
 from youtube_find.yt_action import YTAction
+from youtube_find.playlist import PlaylistExpander
+from youtube_find.recycling import RecyclePolicy, DriverRecycler
+from youtube_find.resilience import Resilience
+from youtube_find.locators import SelectorRegistry
+from youtube_find.archive import SnapshotArchive
+from youtube_find.channel_cache import ChannelCache, ChannelInfo
+from youtube_find.tab_pipeline import TabPipeline
+from youtube_find.extraction import WatchPageExtractor
 import youtube_find.constant as CONST
 import youtube_find.decorators as decorators
+import youtube_find.records as records
+import youtube_find.canonical as canonical
+import youtube_find.log_setup as log_setup
 
 
-# Config logger
-logging.basicConfig(level=logging.INFO,
-                    filename='logs/app.log',
-                    filemode='w',
-                    format='%(asctime)s - %(levelname)s - %(filename)s - %(module)s - %(funcName)s')
+# Config logger: JSON lines written by a background thread, see log_setup
+log_setup.configure_logging('logs/app.log', level=logging.INFO)
 
 youtube_logger = logging.getLogger(__name__)
 youtube_logger.propagate = True
@@ -31,8 +38,54 @@ youtube_logger.propagate = True
 edge_options = Options()
 edge_options.add_experimental_option('detach', True)
 
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+
+# True once the watch page carries its metadata and the player data of the expected video
+_WATCH_READY_SCRIPT = '''
+const expected = arguments[0];
+if (!document.querySelector('meta[itemprop="duration"], meta[property="og:url"]')) return false;
+const responses = [];
+const player = document.getElementById('movie_player');
+try {
+    if (player && player.getPlayerResponse) responses.push(player.getPlayerResponse());
+} catch (e) {}
+if (window.ytInitialPlayerResponse) responses.push(window.ytInitialPlayerResponse);
+return responses.some(r => r && r.videoDetails && (!expected || r.videoDetails.videoId === expected));
+'''
+
+
+# videoDetails of the embedded player response, from the live player first since
+# ytInitialPlayerResponse is only right for the first page of an SPA session
+_PLAYER_DETAILS_SCRIPT = '''
+const expected = arguments[0];
+const responses = [];
+const player = document.getElementById('movie_player');
+try {
+    if (player && player.getPlayerResponse) responses.push(player.getPlayerResponse());
+} catch (e) {}
+const watch = document.querySelector('ytd-watch-flexy');
+if (watch && watch.playerData) responses.push(watch.playerData);
+if (window.ytInitialPlayerResponse) responses.push(window.ytInitialPlayerResponse);
+
+for (const response of responses) {
+    const details = response && response.videoDetails;
+    if (!details || (expected && details.videoId !== expected)) continue;
+    return {
+        videoId: details.videoId,
+        channelId: details.channelId,
+        author: details.author,
+        title: details.title,
+        shortDescription: details.shortDescription,
+        lengthSeconds: details.lengthSeconds,
+        viewCount: details.viewCount
+    };
+}
+return null;
+'''
 
-class YoutubeChecker(webdriver.Edge):
+
+class YoutubeChecker(WatchPageExtractor, webdriver.Edge):
     """
     A class for extracting information from YouTube videos.
     
@@ -44,23 +97,69 @@ class YoutubeChecker(webdriver.Edge):
         auto_closing (bool): Whether to automatically close the browser
     """
     
-    def __init__(self, driver_path: str = CONST.webdriver_path, auto_closing: bool = False) -> None:
+    def __init__(self, driver_path: str = CONST.webdriver_path, auto_closing: bool = False,
+                 recycle_policy: Optional[RecyclePolicy] = None, resilience: Optional[Resilience] = None,
+                 selectors: Optional[SelectorRegistry] = None, archive: Optional[SnapshotArchive] = None,
+                 channel_cache: Optional[ChannelCache] = None, page_load_strategy: str = 'normal',
+                 ready_timeout: float = 15) -> None:
         """
         Args:
             driver_path: Path to the Edge webdriver executable
             auto_closing: If True, browser will close automatically when done
+            recycle_policy: When to replace the browser between retrievals, never by default
+            resilience: Retry and circuit breaker settings of the element lookups
+            selectors: Locator registry, the default one learns and persists its candidate order
+            archive: If given, every retrieved page is recorded there for offline replay
+            channel_cache: Channel name / subscribers by channel id, pass one instance to share it between checkers
+            page_load_strategy: 'normal' waits for the load event, 'eager' / 'none' return early and
+                                `open` waits only for the watch page metadata and player data
+            ready_timeout: Seconds `open` waits for that readiness signal in 'eager' / 'none' mode
         """
         
         self.driver_path = driver_path
-        service = Service(executable_path=self.driver_path)
         
         self.actions = YTAction(self)
+        self.playlists = PlaylistExpander(self)
+        self.recycler = DriverRecycler(self, recycle_policy)
+        self.resilience = resilience or Resilience()
+        self.selectors = selectors or SelectorRegistry()
+        self.archive = archive
+        self.channel_cache = channel_cache or ChannelCache()
+        self._inflight = canonical.SingleFlight()
+        self._driver_lock = threading.RLock()
+        
+        if page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            raise ValueError(f'page_load_strategy must be one of {PAGE_LOAD_STRATEGIES}, got {page_load_strategy!r}')
+        self.page_load_strategy = page_load_strategy
+        self.ready_timeout = ready_timeout
         
         self.auto_closing = auto_closing
-        if not self.auto_closing:
-            super(YoutubeChecker, self).__init__(options=edge_options,service = service)
+        self._start_browser()
+    
+    
+    def _start_browser(self) -> None:
+        service = Service(executable_path=self.driver_path)
+        if self.page_load_strategy == 'normal':
+            options = edge_options if not self.auto_closing else None
+        else:
+            options = Options()
+            if not self.auto_closing:
+                options.add_experimental_option('detach', True)
+            options.page_load_strategy = self.page_load_strategy
+        
+        if options is not None:
+            super(YoutubeChecker, self).__init__(options=options,service = service)
         else:
             super(YoutubeChecker, self).__init__(service = service)
+    
+    
+    def restart(self) -> None:
+        """Quit the browser and start a fresh one in place, this object stays usable"""
+        try:
+            super().quit()
+        except Exception as e:
+            youtube_logger.exception(f'Error closing browser before restart: {e}')
+        self._start_browser()
 
     
     def open(self, url: str = CONST.base_url,full_screen: bool = False) -> None:
@@ -71,83 +170,80 @@ class YoutubeChecker(webdriver.Edge):
             url: The YouTube URL to open
             full_screen: Whether to make the window fullscreen
         """
-        self.get(url)
-        self.actions.close_yt_premium_ad()
+        try:
+            self.get(url)
+        except TimeoutException:
+            self.recycler.note_timeout()
+            raise
+        self.recycler.note_page()
+        
+        video_id = canonical.canonical_video_id(url)
+        if video_id and self.page_load_strategy != 'normal':
+            self.wait_until_ready(video_id)
+        
+        # Also watches for the popup, it usually shows up after the page is ready
+        self.actions.dismiss_premium_ad_if_present()
         if full_screen:
             self.fullscreen_window()
     
     
-    def title(self) -> Optional[str]:
-        """Retrive the title of the video"""
-        return self._get_element_attribute(By.XPATH, '//*[@id="title"]/h1/yt-formatted-string').text
-    
-    
-    def url(self) -> Optional[str]:
-        """Retrive the url of the video"""
-        return self._get_element_attribute(By.CSS_SELECTOR, 'meta[property="og:url"]', 'content')
-    
-    
-    def like_count(self) -> Optional[int]:
-        """Retrive the like count as an integer"""
-        like_count = self._get_element_attribute(By.CSS_SELECTOR, 'button[title="I like this"]', 'aria-label')
-        if like_count:
-            like_count = like_count.split(' ')
-            for token in like_count:
-                if token.replace(',','').isdigit():
-                    return int(token.replace(',',''))
-        return None
+    def wait_until_ready(self, video_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the watch page metadata and the player data of `video_id` are in the DOM.
         
-    
-    def view_count(self) -> Optional[int]:
-        """Retrive the view count as an integer"""
-        view_count = self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="interactionCount"]', 'content')
-        if view_count:
-            return int(view_count)
-    
-    
-    def date_upload(self) -> Optional[str]:
-        """Retrive the upload date of the video"""
-        return self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="uploadDate"]', 'content')
-    
-    
-    def date_publised(self) -> Optional[str]:
-        """Retrive the publised date of the video"""
-        return self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="datePublished"]', 'content')
+        Returns:
+            bool: True if the page got ready in time
+        """
+        timeout = self.ready_timeout if timeout is None else timeout
+        try:
+            WebDriverWait(self, timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(_WATCH_READY_SCRIPT, video_id)
+            )
+            return True
+        except TimeoutException:
+            self.recycler.note_timeout()
+            youtube_logger.error(f'Watch page of {video_id} not ready within {timeout} seconds')
+            return False
     
     
-
-    def video_is_family_friendly(self) -> bool:
-        """Check if youtube family friendly meta tag is 'true'"""
-        friendly = self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="isFamilyFriendly"]', 'content')
-        if friendly:
-            return friendly.lower() == 'true'
+    def player_details(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the videoDetails of the embedded player data in one script call, no UI interaction.
+        Returns None if the data is missing or belongs to another video than the current url.
+        """
+        try:
+            return self.execute_script(_PLAYER_DETAILS_SCRIPT, canonical.canonical_video_id(self.current_url))
+        except WebDriverException as e:
+            youtube_logger.error(f'Could not read the player data: {e}')
+            return None
     
     
-    def description_text(self) -> Optional[str]:
-        """Retrive the full text of an opened description"""
+    def _description_text_from_dom(self) -> Optional[str]:
+        """Fallback: expand the description in the page and read it"""
         if not self.actions.description_is_opened():
             self.actions.open_description()
             
         time.sleep(0.2)
-        description_texts = self._get_element_attribute(By.XPATH, '//*[@id="description-inline-expander"]/yt-attributed-string')
+        description_texts = self._get_element_attribute('description_text')
         if description_texts:
             return description_texts.text.strip()
     
     
-    def video_length(self) -> Optional[str]:
-        """Return the formatted video length"""
-        vid_length = self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="duration"]', 'content')
-        if vid_length:
-            return self._format_video_length(vid_length)
-    
-
-    def channel_name(self) -> Optional[str]:
-        """Get the channel name"""
-        return self._get_element_attribute(By.ID, 'channel-name').text
+    def channel_infos(self) -> ChannelInfo:
+        """
+        Name and subscriber count of the video's channel, scraped once per channel id
+        and then served from the channel cache.
+        """
+        details = self.player_details() or {}
+        channel_id = details.get('channelId')
+        if not channel_id:
+            return super().channel_infos()
+        
+        return self.channel_cache.resolve(channel_id, lambda: (self.channel_name(), self.sub_count()))
     
     
-    def comment_count(self) -> Optional[int]:
-        """Retrive the comment count as an integer"""
+    def _comment_count_element(self) -> Optional[WebElement]:
+        """Scroll like a user until the comments header is rendered and return its count element"""
         if self.actions.description_is_opened():    # simulate human user 
             self.actions.close_description()        # only then youtube will allow scrolling
         else:
@@ -168,97 +264,125 @@ class YoutubeChecker(webdriver.Edge):
         
         time.sleep(random.uniform(0.8, 1.2))
         try:
-            comment_count_element = self.find_element(By.XPATH, '//*[@id="count"]/yt-formatted-string/span[1]')
+            comment_count_element = self.selectors.find(self, 'comment_count', timeout=6)
             if comment_count_element:
                 self.actions.scroll_to_view(comment_count_element)
-                count_text = comment_count_element.text.split(' ')[0]
-                return int(count_text.replace(",", ""))
+                return comment_count_element
         except Exception as e:
             youtube_logger.exception(f'Unexpected Error: {e}')
 
         return None
     
     
-    def sub_count(self) -> Optional[str]:
-        """Get the subcriber count of the channel"""
-        sub_count = self._get_element_attribute(By.ID, 'owner-sub-count')
-        if sub_count:
-            sub_count: List = sub_count.text.split(' ')
-            sub_count = sub_count[0]
-            return sub_count
+    def retrieve_infos(self, url: str) -> Optional[Dict[Any, Any]]:
+        """
+        Open the video and retrieve all its infos.
+        Concurrent calls for the same video share one page load, other calls wait for the driver.
+        """
+        if not url:
+            return None
+        
+        video_id = canonical.canonical_video_id(url)
+        if video_id:
+            url = CONST.youtube_watch_url + video_id
+        
+        return self._inflight.do(video_id or url, lambda: self._retrieve_infos_locked(url))
     
     
-    def thumbnail(self) -> Optional[str]:
-        """Retrive the thumnail url of the video"""
-        return self._get_element_attribute(By.CSS_SELECTOR, 'meta[property="og:image"]', 'content')
-
-
-    def video_genre(self) -> Optional[str]:
-        """Get the genre of the video"""
-        return self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="genre"]', 'content')
+    def _retrieve_infos_locked(self, url: str) -> Optional[Dict[Any, Any]]:
+        with self._driver_lock:     # the driver is not thread safe
+            with log_setup.correlation_scope(canonical.canonical_video_id(url)):
+                return self._retrieve_infos(url)
     
     
-    def keywords_tags(self) -> List[str]:
-        keywords = self._get_element_attribute(By.CSS_SELECTOR, 'meta[name="keywords"]', 'content')
-        if keywords:
-            return keywords.split(',')
+    def _retrieve_infos(self, url: str) -> Optional[Dict[Any, Any]]:
+        self.recycler.maybe_recycle()
+        self.open(url)
+        return self.extract_infos(url)
     
     
-    def regions_allowed(self) -> List[str]:
-        regions_allowed = self._get_element_attribute(By.CSS_SELECTOR, 'meta[itemprop="regionsAllowed"]', 'content')
-        if regions_allowed:
-            return regions_allowed.split(',')
+    def extract_infos(self, url: Optional[str] = None) -> Dict[Any, Any]:
+        """
+        Extract all the infos of the watch page opened in the current tab.
+        
+        Args:
+            url: The url the page was opened with, used for archiving, defaults to the current url
+        """
+        url = url or self.current_url
+        if self.archive is None:
+            return self.page_infos()
+        
+        infos, lookups = self.recorded_page_infos()
+        video_id = canonical.canonical_video_id(infos['Video URL'] or url)
+        try:
+            self.archive.record(video_id or url, self.page_source, url, lookups)
+        except OSError as e:
+            youtube_logger.error(f'Could not archive {url}: {e}')
+        return infos
     
     
-    @decorators.error_handle
-    def banned_regions(self) -> List[str]:
-        allowed_regions = set(self.regions_allowed())
-        banned_regions = []
+    def retrieve_record(self, url: str) -> Optional[records.VideoRecord]:
+        """Retrieve the infos of a video as a typed VideoRecord"""
+        infos = self.retrieve_infos(url)
+        if infos:
+            return records.VideoRecord.from_infos(infos)
+    
+    
+    def retrieve_batch(self, urls: List[str]) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """
+        Retrieve the infos of many videos, one after another.
+        Links pointing to the same video are fetched only once.
         
-        try:
-            with open("Tags.txt", "r") as file:
-                all_regions = file.read().splitlines()
-                for region in all_regions:
-                    if region not in allowed_regions:
-                        banned_regions.append(region)
-           
-        except FileNotFoundError:
-            youtube_logger.error("Error: Tags.txt file not found.")
-            raise
+        Args:
+            urls: Any kind of video links or ids
             
-        return banned_regions
+        Returns:
+            Dict mapping every input url to its infos (None if retrieval failed or not a video link)
+        """
+        by_id = {}
+        for video_id in canonical.dedupe(urls):
+            try:
+                by_id[video_id] = self.retrieve_infos(video_id)
+            except Exception as e:
+                youtube_logger.exception(f'Could not retrieve {video_id}: {e}')
+                by_id[video_id] = None
+        
+        return {url: by_id.get(canonical.canonical_video_id(url)) for url in urls}
     
     
-    def retrieve_infos(self, url: str) -> Optional[Dict[Any, Any]]:
-        if not url:
-            return None
-        
-        self.open(url)
-        self.implicitly_wait(6)
+    def retrieve_pipelined(self, urls: List[str], tabs: int = 3, recycle_after: int = 25) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """
+        Retrieve many videos while the next ones load in background tabs of this browser.
+        Needs a checker created with page_load_strategy 'eager' or 'none', ValueError otherwise:
+        with 'normal' opening a tab blocks until its page is loaded, nothing loads in the background.
         
-        infos = {
-            'Title' : self.title(),
-            'Video Length' : self.video_length(),
-            'View Count' : self.view_count(),
-            'Like Count' : self.like_count(),
-            'Comment Count' : self.comment_count(),
-            'Upload Date' : self.date_upload(),
-            'ChannelName' : self.channel_name(),
-            'Sub Count' : self.sub_count(),
-            'Description' : self.description_text(),
-            'Video URL' : self.url(),
-            'Thumbnail' : self.thumbnail(),
-            'Family Friendly' : self.video_is_family_friendly(),
-            'Video Genre' : self.video_genre(),
-            'KeyWords' : self.keywords_tags(),
-            'Banned Regions' : self.banned_regions(),
-            'Allowed Regions' : self.regions_allowed()
-        }
-        return infos
+        Args:
+            urls: Any kind of video links or ids
+            tabs: Number of tabs kept open
+            recycle_after: Pages a tab loads before it is replaced
+            
+        Returns:
+            Dict mapping every video id to its infos (None if extraction failed)
+        """
+        if self.page_load_strategy == 'normal':
+            raise ValueError("retrieve_pipelined needs page_load_strategy='eager' or 'none', "
+                             "with 'normal' the pages are not prefetched")
+        return dict(TabPipeline(self, tabs, recycle_after).run(urls))
+    
+    
+    def retrieve_playlist(self, url: str) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """Expand a playlist / mix in bulk and retrieve the infos of all its videos"""
+        return self.retrieve_batch(self.playlists.video_urls(url))
+    
+    
+    def close_tab(self) -> None:
+        """Close only the current tab (close() quits the whole browser)"""
+        super().close()
     
     
     def close(self) -> None:
         """Safely close the browser and clean up."""
+        self.selectors.save()
         try:
             super().quit()
         except Exception as e:
@@ -276,50 +400,55 @@ class YoutubeChecker(webdriver.Edge):
     
     
     @decorators.error_handle
-    def _get_element_attribute(self, by: By, value: str, attribute: str = None, wait_time: int = 7) -> None | str | WebElement:
+    def _get_element_attribute(self, name: str, attribute: str = None, wait_time: int = 7) -> None | str | WebElement:
         """
-        Return the attribute of the web element, if no attribute is inputed, return that web element
+        Return the attribute of the web element registered as `name`, if no attribute is inputed, return that web element.
+        Returns None right away while the circuit breaker of this element is open.
         """
-        element = WebDriverWait(self, wait_time).until(
-            EC.presence_of_element_located((by, value))
+        if not self.resilience.allow(name):
+            return None
+        
+        element = self.resilience.call(
+            name,
+            lambda wait: self.selectors.find(self, name, wait),
+            self._page_ready,
+            wait_time,
         )
         if element:
+            self.recycler.note_success()
             if attribute:
                 return element.get_attribute(attribute)
             else:
                 return element
         
-        raise Exception(f'ElementNotFoundException: Could not locate element {by}="{value}"')
-        
-        
+        raise Exception(f'ElementNotFoundException: Could not locate element {name}')
+    
+    
     @decorators.error_handle
-    def _get_all_element(self, by: By, value: str, wait_time: int = 7) -> Optional[List[WebElement]]:
-        elements = WebDriverWait(self, wait_time).until(
-            EC.presence_of_all_elements_located((by, value))
+    def _get_all_element(self, name: str, wait_time: int = 7) -> Optional[List[WebElement]]:
+        if not self.resilience.allow(name):
+            return None
+        
+        elements = self.resilience.call(
+            name,
+            lambda wait: self.selectors.find_all(self, name, wait),
+            self._page_ready,
+            wait_time,
         )
         if elements:
             return elements
     
-        raise Exception(f'ElementNotFoundException: Could not locate element {by}="{value}"')
+        raise Exception(f'ElementNotFoundException: Could not locate element {name}')
+    
+    
+    def _page_ready(self) -> bool:
+        """True once the watch page finished loading, so a missing element is not just a slow one"""
+        return self.execute_script(
+            "return document.readyState === 'complete' && !!document.querySelector('ytd-watch-flexy');"
+        )
+    
     
     @staticmethod
-    def _format_video_length(length: str) -> str:
-        length = length[2:]
-        minutes = ""
-        seconds = ""
-        count = 0
-        
-        for letter in length:
-            if letter in string.ascii_letters:
-                count += 1
-                break
-            else:
-                count += 1
-                minutes += letter
-        time = int(length[count: -1]) + int(minutes) * 60
-        
-        hour = time // 3600
-        minutes = (time % 3600) // 60
-        seconds = time - (hour * 3600 + minutes * 60)
-        
-        return f"{hour:02}:{minutes:02}:{seconds:02}"
+    def _format_video_length(length: str) -> Optional[str]:
+        """Format an ISO-8601 duration ('PT1H2M3S') as 'HH:MM:SS'"""
+        return records.format_duration(records.parse_duration(length))
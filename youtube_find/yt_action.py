@@ -7,10 +7,68 @@ from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
 import logging
+from typing import Dict, Optional
 
 import youtube_find.decorators as decorators
 youtube_logger = logging.getLogger('youtube_find.youtube_checker')
 
+# Every interaction state of the watch page in a single round trip
+_STATE_SNAPSHOT_SCRIPT = '''
+const [likeSel, dislikeSel] = arguments;
+const pressed = (sel) => {
+    const button = document.querySelector(sel);
+    return button ? button.getAttribute('aria-pressed') === 'true' : null;
+};
+const subRenderer = document.querySelector('#subscribe-button ytd-subscribe-button-renderer, ytd-subscribe-button-renderer');
+let subscribed = null;
+if (subRenderer) {
+    subscribed = subRenderer.hasAttribute('subscribed');
+    const label = subRenderer.querySelector('.yt-spec-button-shape-next__button-text-content');
+    if (!subscribed && label) subscribed = label.textContent.trim() === 'Subscribed';
+}
+const video = document.querySelector('#movie_player video, video.html5-main-video');
+const expander = document.querySelector('#description-inline-expander');
+const collapse = document.querySelector('#description-inline-expander #collapse, #collapse');
+let descriptionOpened = null;
+if (expander && expander.hasAttribute('is-expanded')) {
+    descriptionOpened = true;
+} else if (collapse) {
+    descriptionOpened = collapse.offsetParent !== null;
+} else if (expander) {
+    descriptionOpened = false;
+}
+return {
+    liked: pressed(likeSel),
+    disliked: pressed(dislikeSel),
+    subscribed: subscribed,
+    playing: video ? !(video.paused || video.ended) : null,
+    description_opened: descriptionOpened
+};
+'''
+
+# Clicks the dismiss button of the Premium popup now and every time it is (re)inserted, once per document
+_PREMIUM_AD_WATCHER_SCRIPT = '''
+const selector = arguments[0];
+const dismiss = () => {
+    const button = document.querySelector(selector);
+    if (!button || button.offsetParent === null) return false;
+    button.click();
+    return true;
+};
+if (!window.__premiumAdWatcher) {
+    let scheduled = false;
+    window.__premiumAdWatcher = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        // Coalesce the mutation bursts of the page into one lookup, a timer also runs in background tabs
+        setTimeout(() => { scheduled = false; dismiss(); }, 50);
+    });
+    window.__premiumAdWatcher.observe(document.documentElement, {childList: true, subtree: true});
+}
+return dismiss();
+'''
+
+
 class YTAction:
     """
     A class for performing actions on YouTube videos.
@@ -60,6 +118,26 @@ class YTAction:
             raise
 
     
+    @decorators.error_handle
+    def wait_for(self, name: str, timeout: int = 7) -> WebElement:
+        """
+        Wait for an element of the selector registry to be present and return it.
+        All its candidate locators are checked at once, the first one that exists wins.
+        
+        Args:
+            name: Logical element name in the driver's SelectorRegistry
+            timeout: How long to wait for element
+            
+        Returns:
+            WebElement if found, raises TimeoutException otherwise.
+        """
+        try:
+            return self.driver.selectors.find(self.driver, name, timeout)
+        except TimeoutException as e:
+            youtube_logger.error(f'Element not found within {timeout} seconds: {name}')
+            raise TimeoutException(f'Element not found within {timeout} seconds: {name}') from e
+
+    
     def search(self, content: str) -> bool:
         """
         Search for the specified content on YouTube.
@@ -70,21 +148,47 @@ class YTAction:
         Returns:
             bool: True if search was successful, False otherwise
         """
-        search_box = self.wait_for_element(By.NAME, 'search_query')
+        search_box = self.wait_for('search_box')
         search_box.click()
         search_box.send_keys(content)
         search_box.submit()
         return True
 
+    def state_snapshot(self, timeout: float = 0) -> Dict[str, Optional[bool]]:
+        """
+        Read every interaction state of the current video in one injected script.
+        
+        Args:
+            timeout: If positive, wait up to this many seconds for the like button and the player to render
+            
+        Returns:
+            Dict with 'liked', 'disliked', 'subscribed', 'playing' and 'description_opened',
+            a value is None when its element is not on the page
+        """
+        like_css = self.driver.selectors.css('like_button')
+        dislike_css = self.driver.selectors.css('dislike_button')
+        
+        def read(driver):
+            return driver.execute_script(_STATE_SNAPSHOT_SCRIPT, like_css, dislike_css)
+        
+        def rendered(driver):
+            state = read(driver)
+            if state['liked'] is not None and state['playing'] is not None:
+                return state
+            return False
+        
+        if timeout > 0:
+            try:
+                return WebDriverWait(self.driver, timeout).until(rendered)
+            except TimeoutException:
+                youtube_logger.error(f'Watch page controls not rendered within {timeout} seconds')
+        return read(self.driver)
+    
     def is_liked(self) -> bool:
         """
         Check if the current video is already liked.
         """
-        like_count : int = self.driver.like_count()
-        like_button = self.wait_for_element(
-            By.CSS_SELECTOR, f'button[aria-label="like this video along with {like_count:,} other people"]'
-        )
-        return like_button.get_attribute('aria-pressed') == 'true'
+        return bool(self.state_snapshot()['liked'])
     
     def like(self) -> bool:
         """
@@ -94,10 +198,7 @@ class YTAction:
             bool: True if like successful, False otherwise
         """
         
-        like_count = self.driver.like_count()
-        like_button = self.wait_for_element(
-            By.CSS_SELECTOR, f'button[aria-label="like this video along with {like_count:,} other people"]'
-        )
+        like_button = self.wait_for('like_button')
         self.scroll_to_view(like_button)
         self.click_element(like_button)
         return True
@@ -110,7 +211,7 @@ class YTAction:
             bool: True if disliked successfully, False otherwise
         """
         
-        dislike_button = self.wait_for_element(By.CSS_SELECTOR, 'button[aria-label="Dislike this video"]')
+        dislike_button = self.wait_for('dislike_button')
         self.scroll_to_view(dislike_button)
         self.click_element(dislike_button)
         return True
@@ -119,8 +220,7 @@ class YTAction:
         """
         Return True if already disliked the video, False otherwise,
         """
-        dislike_button = self.wait_for_element(By.CSS_SELECTOR, 'button[aria-label="Dislike this video"]')
-        return dislike_button.get_attribute('aria-pressed') == 'true'
+        return bool(self.state_snapshot()['disliked'])
     
     def comment(self, content: str) -> None:
         """
@@ -130,7 +230,7 @@ class YTAction:
         if not content:
             return
         
-        comment_box = self.wait_for_element(By.ID, 'placeholder-area')
+        comment_box = self.wait_for('comment_box')
         self.scroll_to_view(comment_box)
         comment_box.click()
         time.sleep(0.1)
@@ -145,7 +245,7 @@ class YTAction:
         """
         ***Method not usable due to needing to log in to comment***
         """
-        comment_button = self.wait_for_element(By.CSS_SELECTOR, 'button[aria-label="Comment"]')
+        comment_button = self.wait_for('comment_submit')
         return comment_button
 
     def to_next_video(self) -> bool:
@@ -155,7 +255,7 @@ class YTAction:
         Returns:
             bool: True if navigation successful, False otherwise
         """
-        next_button = self.wait_for_element(By.CSS_SELECTOR, 'a[aria-label="Next keyboard shortcut SHIFT+n"]')
+        next_button = self.wait_for('next_button')
         self.scroll_to_view(next_button)
         next_button.click()
         return True
@@ -207,23 +307,21 @@ class YTAction:
         """
         Click on the pause button of the video
         """
-        pause_button = self.wait_for_element(By.CSS_SELECTOR, '.ytp-play-button.ytp-button')
+        pause_button = self.wait_for('play_button')
         if pause_button:
             self.scroll_to_view(pause_button)
             self.click_element(pause_button)
             
     def is_playing(self) -> bool:
-        button = self.wait_for_element(By.CSS_SELECTOR, '.ytp-play-button.ytp-button')
-        if button:
-            button = button.get_attribute('aria-label')
-            return button.split(' ')[0] == 'Pause'
+        """Return True if the video element is playing"""
+        return bool(self.state_snapshot()['playing'])
     
     
     def click_search_video(self) -> None:
         """
         Click on the first video found after searching for something
         """
-        video_title = self.wait_for_element(By.ID, 'video-title')
+        video_title = self.wait_for('search_result_title')
         self.scroll_to_view(video_title)
         video_title.click()
     
@@ -248,14 +346,13 @@ class YTAction:
         Returns:
             bool: True if subscribed, False otherwise
         """
-        is_sub = self.wait_for_element(By.CLASS_NAME, 'yt-spec-button-shape-next__button-text-content')
-        return is_sub.text == 'Subscribed' if is_sub else False
+        return bool(self.state_snapshot()['subscribed'])
     
     def sub(self) -> None:
         """
         Subscribe to the current video channel if not already subscribed.
         """
-        subscribe_button = self.wait_for_element(By.XPATH, '//*[@id="subscribe-button-shape"]/button')
+        subscribe_button = self.wait_for('subscribe_button')
         self.scroll_to_view(subscribe_button)
         subscribe_button.click()
     
@@ -264,10 +361,10 @@ class YTAction:
         Unsubscribe from the current video channel if already subscribed.
         """
         if self.is_subbed():
-            unsubscribe_button = self.wait_for_element(By.CSS_SELECTOR, '//*[@id="notification-preference-button"]/ytd-subscription-notification-toggle-button-renderer-next/yt-button-shape/button')
+            unsubscribe_button = self.wait_for('notification_button')
             self.scroll_to_view(unsubscribe_button)
             unsubscribe_button.click()
-            unsub_button = self.wait_for_element(By.XPATH, '//*[@id="items"]/ytd-menu-service-item-renderer[4]/tp-yt-paper-item/yt-formatted-string')
+            unsub_button = self.wait_for('unsubscribe_menu_item')
             if unsub_button:
                 unsub_button.click()
     
@@ -277,7 +374,7 @@ class YTAction:
         if self.description_is_opened():
             return
         
-        description = self.wait_for_element(By.ID, 'bottom-row')
+        description = self.wait_for('description_expander')
         
         if description:
             self.scroll_to_view(description)
@@ -285,11 +382,8 @@ class YTAction:
             
 
     def description_is_opened(self) -> bool:
-        description = self.wait_for_element(By.ID, 'collapse')
-        if description:
-            return description.is_displayed()
-    
-        return False
+        """Return True if the description is expanded"""
+        return bool(self.state_snapshot()['description_opened'])
     
     
     def close_description(self) -> None:
@@ -297,14 +391,14 @@ class YTAction:
         if not self.description_is_opened():
             return
         
-        close = self.wait_for_element(By.ID, 'collapse')
+        close = self.wait_for('description_collapse')
         if close:
             self.scroll_to_view(close)
             close.click()
     
     
     def click_video_on_main_page(self) -> None:
-        video_link = self.wait_for_element(By.ID, 'media-container-link')
+        video_link = self.wait_for('home_video_link')
         if video_link:
             self.scroll_to_view(video_link)
             video_link.click()
@@ -317,7 +411,7 @@ class YTAction:
         Returns:
             bool: True if navigation to channel successful, False otherwise
         """
-        channel_name = self.wait_for_element(By.ID, 'channel-name')
+        channel_name = self.wait_for('channel_link')
         if channel_name:
             self.scroll_to_view(channel_name)
             channel_name.click()
@@ -325,11 +419,23 @@ class YTAction:
         return False
             
     
+    def dismiss_premium_ad_if_present(self) -> bool:
+        """
+        Close the YouTube Premium popup whenever it shows up on this page: it is closed now if
+        displayed, and a MutationObserver closes it if it appears later, without polling.
+        The observer lives as long as the document, call this again after every full page load.
+        
+        Returns:
+            bool: True if a popup was dismissed right now
+        """
+        return bool(self.driver.execute_script(_PREMIUM_AD_WATCHER_SCRIPT, self.driver.selectors.css('premium_ad_dismiss')))
+    
+    
     def close_yt_premium_ad(self) -> None:
         """
         Close the YouTube Premium advertisement popup if present.
         """
-        reject_button = self.wait_for_element(By.CSS_SELECTOR, 'button[aria-label="No thanks"]')
+        reject_button = self.wait_for('premium_ad_dismiss')
         if reject_button:
             reject_button.click()
             